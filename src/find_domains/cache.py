@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import diskcache
+
+# Persistent caches live under this directory unless FIND_DOMAINS_CACHE_DIR is set
+DEFAULT_CACHE_DIR = Path(".cache")
+
+
+@lru_cache(maxsize=None)
+def get_cache(name: str) -> diskcache.Cache:
+    """Get the named on-disk cache (e.g. "rdap"), shared across pipeline runs."""
+    root = Path(os.environ.get("FIND_DOMAINS_CACHE_DIR", DEFAULT_CACHE_DIR))
+    return diskcache.Cache(root / name)
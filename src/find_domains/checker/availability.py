@@ -2,15 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+from collections import defaultdict
+from collections.abc import Awaitable
+from contextlib import AsyncExitStack
 from dataclasses import dataclass
+from typing import TypeVar
 
-import dns.resolver
+import aiodns
 import httpx
 
+from find_domains.cache import get_cache
 from find_domains.typos.generator import TypoCandidate
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # RDAP bootstrap for common TLDs
 RDAP_SERVERS: dict[str, str] = {
     ".com": "https://rdap.verisign.com/com/v1",
@@ -30,8 +38,15 @@ RDAP_SERVERS: dict[str, str] = {
 # IANA bootstrap URL
 RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
 
+# How long to trust an RDAP answer when the server sends no max-age.
+# Unregistered domains can be snapped up, so they expire sooner.
+RDAP_TTL_REGISTERED = 24 * 3600
+RDAP_TTL_UNREGISTERED = 3600
 
-@dataclass
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+@dataclass(slots=True, frozen=True)
 class AvailabilityResult:
     candidate: TypoCandidate
     has_dns: bool
@@ -39,82 +54,277 @@ class AvailabilityResult:
     available: bool
 
 
-def _check_dns(domain: str) -> bool:
-    """Check if a domain has any DNS records. Returns True if records exist."""
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 3
-    resolver.lifetime = 3
+# Record types probed to decide whether a domain is in use. CNAME is not
+# needed: an alias is followed when resolving A/AAAA, so it already shows up.
+DNS_RDTYPES = ("A", "AAAA", "MX")
+
+# DNS timeouts in seconds. Until a resolver round trip has been observed the
+# initial timeout applies; after that it tracks the resolver's measured RTT,
+# times DNS_RTT_MULTIPLIER, within [DNS_MIN_TIMEOUT, DNS_MAX_TIMEOUT]. Record
+# types are queried in parallel, so this bounds the time spent per attempt.
+DNS_INITIAL_TIMEOUT = 2.0
+DNS_MIN_TIMEOUT = 0.25
+DNS_MAX_TIMEOUT = 3.0
+DNS_RTT_MULTIPLIER = 5.0
+# Weight of the newest sample in the RTT moving average
+DNS_RTT_SMOOTHING = 0.2
+
+
+@dataclass
+class DnsRtt:
+    """Exponential moving average of the resolver's response time."""
+
+    avg: float | None = None
+
+    def observe(self, seconds: float) -> None:
+        if self.avg is None:
+            self.avg = seconds
+        else:
+            self.avg += DNS_RTT_SMOOTHING * (seconds - self.avg)
+
+    @property
+    def timeout(self) -> float:
+        if self.avg is None:
+            return DNS_INITIAL_TIMEOUT
+        return max(DNS_MIN_TIMEOUT, min(DNS_MAX_TIMEOUT, DNS_RTT_MULTIPLIER * self.avg))
+
+
+async def _bounded(sem: asyncio.Semaphore, aw: Awaitable[T]) -> T:
+    """Await *aw* while holding *sem*, capping how many run at once."""
+    async with sem:
+        return await aw
 
-    for rdtype in ["A", "AAAA", "CNAME", "MX"]:
-        try:
-            resolver.resolve(domain, rdtype)
-            return True
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers):
-            continue
-        except dns.exception.Timeout:
-            continue
-        except Exception:
-            continue
 
+def _dns_error_code(query: asyncio.Future) -> int | None:
+    exc = query.exception()
+    if isinstance(exc, aiodns.error.DNSError) and exc.args:
+        return exc.args[0]
+    return None
+
+
+def _proves_exists(query: asyncio.Future) -> bool:
+    """Whether a finished DNS query shows the domain exists.
+
+    An answer obviously does, but so does NoAnswer (the zone exists, it just
+    has no records of that type). Only NXDOMAIN says the name is unused;
+    timeouts and server failures prove nothing either way.
+    """
+    if query.cancelled():
+        return False
+    return query.exception() is None or _dns_error_code(query) == aiodns.error.ARES_ENODATA
+
+
+def _got_response(query: asyncio.Future) -> bool:
+    """Whether a finished DNS query was answered by the resolver at all."""
+    if query.cancelled():
+        return False
+    return query.exception() is None or _dns_error_code(query) in (
+        aiodns.error.ARES_ENODATA, aiodns.error.ARES_ENOTFOUND,
+    )
+
+
+async def _query_dns(
+    resolver: aiodns.DNSResolver,
+    domain: str,
+    rtt: DnsRtt,
+    timeout: float,
+) -> bool | None:
+    """Query all record types once. Returns None if *timeout* ran out undecided."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    pending = {asyncio.ensure_future(resolver.query_dns(domain, rdtype)) for rdtype in DNS_RDTYPES}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=deadline - loop.time(), return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                return None
+            for t in done:
+                if _got_response(t):
+                    rtt.observe(loop.time() - start)
+            if any(_proves_exists(t) for t in done):
+                return True
+        return False
+    finally:
+        for t in pending:
+            t.cancel()
+
+
+async def _check_dns(resolver: aiodns.DNSResolver, domain: str, rtt: DnsRtt | None = None) -> bool:
+    """Check if a domain has any DNS records. Returns True if records exist.
+
+    All record types are queried at once; the first one proving the domain
+    exists wins and the remaining queries are cancelled. The timeout follows
+    the resolver RTT observed so far (*rtt*); an attempt that times out is
+    retried once with double the timeout.
+    """
+    rtt = rtt or DnsRtt()
+    timeout = rtt.timeout
+    for _ in range(2):
+        has_dns = await _query_dns(resolver, domain, rtt, timeout)
+        if has_dns is not None:
+            return has_dns
+        timeout *= 2
     return False
 
 
+def _rdap_ttl(resp: httpx.Response, registered: bool) -> int:
+    """Seconds to cache an RDAP answer, honouring Cache-Control max-age if present."""
+    match = MAX_AGE_PATTERN.search(resp.headers.get("cache-control", ""))
+    if match:
+        return int(match.group(1))
+    return RDAP_TTL_REGISTERED if registered else RDAP_TTL_UNREGISTERED
+
+
 async def _check_rdap(client: httpx.AsyncClient, domain: str, tld: str) -> bool | None:
-    """Check RDAP for domain registration. Returns True if registered, False if not, None if error."""
+    """Check RDAP for domain registration. Returns True if registered, False if not, None if error.
+
+    Definitive answers are cached on disk so repeat runs skip the lookup.
+    """
     # Find the RDAP server for this TLD
     server = RDAP_SERVERS.get(tld)
     if not server:
         return None
 
+    cache = get_cache("rdap")
+    cached = cache.get(domain)
+    if cached is not None:
+        return cached
+
     url = f"{server}/domain/{domain}"
     try:
         resp = await client.get(url, follow_redirects=True)
         if resp.status_code == 200:
-            return True
+            registered = True
         elif resp.status_code == 404:
-            return False
+            registered = False
         else:
             return None
     except Exception:
         log.debug("RDAP check failed for %s", domain, exc_info=True)
         return None
 
+    ttl = _rdap_ttl(resp, registered)
+    if ttl > 0:
+        cache.set(domain, registered, expire=ttl)
+    return registered
 
-async def check_availability(
+
+async def _check_rdap_host(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
     candidates: list[TypoCandidate],
-    dns_delay_ms: int = 100,
-    rdap_delay_ms: int = 500,
-) -> list[AvailabilityResult]:
-    """Check domain availability for a list of typo candidates.
+    warm: bool = False,
+) -> list[bool | None]:
+    """RDAP-check candidates that are all served by one RDAP server.
 
-    Strategy:
-    1. DNS check first (fast) — if records exist, domain is taken
-    2. For domains with no DNS records, confirm via RDAP
+    Unless the client is already *warm*, the first lookup runs on its own so
+    the connection (and HTTP/2 session) to the server is set up once; the rest
+    then reuse it instead of each racing to open their own.
     """
-    results: list[AvailabilityResult] = []
-    dns_passed: list[TypoCandidate] = []
-
-    # Phase 1: DNS checks
-    for candidate in candidates:
-        has_dns = _check_dns(candidate.domain)
-        if has_dns:
-            results.append(AvailabilityResult(
-                candidate=candidate,
-                has_dns=True,
-                rdap_registered=None,
-                available=False,
-            ))
-        else:
-            dns_passed.append(candidate)
+    if warm:
+        return await asyncio.gather(*[
+            _bounded(sem, _check_rdap(client, c.domain, c.tld)) for c in candidates
+        ])
+    first = await _check_rdap(client, candidates[0].domain, candidates[0].tld)
+    rest = await asyncio.gather(*[
+        _bounded(sem, _check_rdap(client, c.domain, c.tld)) for c in candidates[1:]
+    ])
+    return [first, *rest]
+
+
+class AvailabilityChecker:
+    """Checks batches of candidates with one resolver and one set of RDAP clients.
+
+    The DNS RTT estimate and per-server RDAP connections carry over from one
+    check() call to the next, so checking candidates in several batches costs
+    no more setup than checking them all at once. Use as an async context
+    manager; everything is closed on exit.
+    """
+
+    def __init__(self, dns_concurrency: int = 50, rdap_concurrency_per_host: int = 8) -> None:
+        self._dns_sem = asyncio.Semaphore(dns_concurrency)
+        self._rtt = DnsRtt()
+        self._resolver: aiodns.DNSResolver | None = None
+        self._rdap_concurrency = rdap_concurrency_per_host
+        self._limits = httpx.Limits(
+            max_connections=rdap_concurrency_per_host,
+            max_keepalive_connections=rdap_concurrency_per_host,
+        )
+        self._stack = AsyncExitStack()
+        # RDAP server -> (client, request cap); TLDs on the same server share one
+        self._rdap_hosts: dict[str, tuple[httpx.AsyncClient, asyncio.Semaphore]] = {}
+
+    async def __aenter__(self) -> AvailabilityChecker:
+        # c-ares gets the longest timeout a retry can use; _check_dns enforces
+        # the adaptive one itself
+        self._resolver = aiodns.DNSResolver(timeout=2 * DNS_MAX_TIMEOUT, tries=1)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        try:
+            await self._stack.aclose()
+        finally:
+            await self._resolver.close()
 
-        await asyncio.sleep(dns_delay_ms / 1000.0)
+    async def _rdap_host(self, server: str, candidates: list[TypoCandidate]) -> list[bool | None]:
+        host = self._rdap_hosts.get(server)
+        warm = host is not None
+        if host is None:
+            client = await self._stack.enter_async_context(
+                httpx.AsyncClient(http2=True, limits=self._limits, timeout=10),
+            )
+            host = self._rdap_hosts[server] = (client, asyncio.Semaphore(self._rdap_concurrency))
+        return await _check_rdap_host(*host, candidates, warm=warm)
 
-    # Phase 2: RDAP confirmation for DNS-clear domains
-    if dns_passed:
-        async with httpx.AsyncClient(timeout=10) as client:
-            for candidate in dns_passed:
-                rdap_result = await _check_rdap(client, candidate.domain, candidate.tld)
+    async def check(self, candidates: list[TypoCandidate]) -> list[AvailabilityResult]:
+        """Check domain availability for a list of typo candidates.
 
+        Strategy:
+        1. DNS check first (fast) — if records exist, domain is taken
+        2. For domains with no DNS records, confirm via RDAP
+        """
+        results: list[AvailabilityResult] = []
+        dns_passed: list[TypoCandidate] = []
+
+        # Phase 1: DNS checks, up to dns_concurrency in flight at once
+        dns_results = await asyncio.gather(*[
+            _bounded(self._dns_sem, _check_dns(self._resolver, c.domain, self._rtt))
+            for c in candidates
+        ])
+
+        for candidate, has_dns in zip(candidates, dns_results):
+            if has_dns:
+                results.append(AvailabilityResult(
+                    candidate=candidate,
+                    has_dns=True,
+                    rdap_registered=None,
+                    available=False,
+                ))
+            else:
+                dns_passed.append(candidate)
+
+        # Phase 2: RDAP confirmation for DNS-clear domains, capped per RDAP server
+        if dns_passed:
+            by_server: dict[str, list[int]] = defaultdict(list)
+            for i, c in enumerate(dns_passed):
+                by_server[RDAP_SERVERS.get(c.tld, "")].append(i)
+            # No known server: leave the answer as None without a request
+            by_server.pop("", None)
+
+            rdap_results: list[bool | None] = [None] * len(dns_passed)
+            host_results = await asyncio.gather(*[
+                self._rdap_host(server, [dns_passed[i] for i in indices])
+                for server, indices in by_server.items()
+            ])
+
+            for indices, answers in zip(by_server.values(), host_results):
+                for i, answer in zip(indices, answers):
+                    rdap_results[i] = answer
+
+            for candidate, rdap_result in zip(dns_passed, rdap_results):
                 if rdap_result is False:
                     available = True
                 elif rdap_result is True:
@@ -130,6 +340,18 @@ async def check_availability(
                     available=available,
                 ))
 
-                await asyncio.sleep(rdap_delay_ms / 1000.0)
+        return results
+
 
-    return results
+async def check_availability(
+    candidates: list[TypoCandidate],
+    dns_concurrency: int = 50,
+    rdap_concurrency_per_host: int = 8,
+) -> list[AvailabilityResult]:
+    """Check domain availability for a list of typo candidates in one go.
+
+    See AvailabilityChecker.check; use an AvailabilityChecker directly to check
+    several batches over the same connections.
+    """
+    async with AvailabilityChecker(dns_concurrency, rdap_concurrency_per_host) as checker:
+        return await checker.check(candidates)
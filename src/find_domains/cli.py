@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
 import click
@@ -30,4 +31,6 @@ def scan(
 ) -> None:
     """Run the domain scanning pipeline."""
     cfg = load_config(config_path)
-    run_pipeline(cfg, target=target, output_dir=output_dir, top_n=top, skip_llm=skip_llm, max_per_brand=max_per_brand)
+    asyncio.run(run_pipeline(
+        cfg, target=target, output_dir=output_dir, top_n=top, skip_llm=skip_llm, max_per_brand=max_per_brand,
+    ))
@@ -5,6 +5,11 @@ from pathlib import Path
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
 DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "config.yaml"
 
 
@@ -26,8 +31,8 @@ class OpenAIConfig:
 
 @dataclass
 class RateLimitsConfig:
-    dns_delay_ms: int = 100
-    rdap_delay_ms: int = 500
+    dns_concurrency: int = 50
+    rdap_concurrency_per_host: int = 8
 
 
 @dataclass
@@ -52,7 +57,7 @@ def load_config(path: Path | None = None) -> Config:
         return Config()
 
     with open(path) as f:
-        raw = yaml.safe_load(f)
+        raw = yaml.load(f, Loader=SafeLoader)
 
     if not raw:
         return Config()
@@ -78,8 +83,8 @@ def load_config(path: Path | None = None) -> Config:
             scorer_model=openai_raw.get("scorer_model", "gpt-4o-mini"),
         ),
         rate_limits=RateLimitsConfig(
-            dns_delay_ms=rate_raw.get("dns_delay_ms", 100),
-            rdap_delay_ms=rate_raw.get("rdap_delay_ms", 500),
+            dns_concurrency=rate_raw.get("dns_concurrency", 50),
+            rdap_concurrency_per_host=rate_raw.get("rdap_concurrency_per_host", 8),
         ),
         max_targets=raw.get("max_targets", 50),
         max_typos_per_target=raw.get("max_typos_per_target", 30),
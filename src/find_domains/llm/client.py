@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import json
 import logging
+from functools import lru_cache
 
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 
 log = logging.getLogger(__name__)
 
@@ -13,6 +14,24 @@ def get_client() -> OpenAI:
     return OpenAI()
 
 
+@lru_cache(maxsize=1)
+def get_async_client() -> AsyncOpenAI:
+    """Get the shared async OpenAI client, whose requests reuse one HTTP/2 connection.
+
+    The client's connections belong to the event loop that first uses it: close
+    it and call get_async_client.cache_clear() before that loop ends.
+    """
+    return AsyncOpenAI(http_client=DefaultAsyncHttpxClient(http2=True))
+
+
+def _parse_json(content: str) -> dict | list:
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        log.warning("Failed to parse LLM response as JSON: %s", content[:200])
+        return {}
+
+
 def chat_json(client: OpenAI, model: str, system: str, user: str) -> dict | list:
     """Send a chat completion request and parse the response as JSON."""
     response = client.chat.completions.create(
@@ -25,12 +44,22 @@ def chat_json(client: OpenAI, model: str, system: str, user: str) -> dict | list
         temperature=0.7,
     )
 
-    content = response.choices[0].message.content or "{}"
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        log.warning("Failed to parse LLM response as JSON: %s", content[:200])
-        return {}
+    return _parse_json(response.choices[0].message.content or "{}")
+
+
+async def chat_json_async(client: AsyncOpenAI, model: str, system: str, user: str) -> dict | list:
+    """Async variant of chat_json, so independent requests can run concurrently."""
+    response = await client.chat.completions.create(
+        model=model,
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        temperature=0.7,
+    )
+
+    return _parse_json(response.choices[0].message.content or "{}")
 
 
 def chat_text(client: OpenAI, model: str, system: str, user: str) -> str:
@@ -3,11 +3,12 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-from openai import OpenAI
+import numpy as np
+from openai import AsyncOpenAI
 
 from find_domains.checker.availability import AvailabilityResult
 from find_domains.config import ScoringConfig
-from find_domains.llm.client import chat_json
+from find_domains.llm.client import chat_json_async
 
 log = logging.getLogger(__name__)
 
@@ -38,7 +39,7 @@ Return JSON:
 """
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ScoredDomain:
     domain: str
     original: str
@@ -48,51 +49,61 @@ class ScoredDomain:
     breakdown: dict[str, float]
 
 
+# TLD quality on a 0-1 scale; unlisted TLDs score _DEFAULT_TLD_QUALITY
+_TLD_QUALITY: dict[str, float] = {
+    ".com": 1.0, ".net": 0.7, ".org": 0.65,
+    ".io": 0.8, ".ai": 0.85, ".co": 0.75,
+    ".app": 0.6, ".dev": 0.55, ".xyz": 0.3,
+    ".me": 0.4, ".gg": 0.45, ".tv": 0.4,
+}
+_DEFAULT_TLD_QUALITY = 0.3
+
+
 def _tld_quality_score(tld: str) -> float:
     """Score TLD quality on 0-1 scale."""
-    tld_scores = {
-        ".com": 1.0, ".net": 0.7, ".org": 0.65,
-        ".io": 0.8, ".ai": 0.85, ".co": 0.75,
-        ".app": 0.6, ".dev": 0.55, ".xyz": 0.3,
-        ".me": 0.4, ".gg": 0.45, ".tv": 0.4,
-    }
-    return tld_scores.get(tld, 0.3)
+    return _TLD_QUALITY.get(tld, _DEFAULT_TLD_QUALITY)
+
+
+# Length score for a domain's name part, indexed by length; longer names
+# share the last entry.
+_MAX_SCORED_LENGTH = 64
+_LEN_TABLE = np.array([
+    1.0 if n <= 5 else 0.8 if n <= 8 else 0.6 if n <= 12 else 0.4 if n <= 16 else 0.2
+    for n in range(_MAX_SCORED_LENGTH + 1)
+])
 
 
 def _domain_length_score(domain: str) -> float:
     """Shorter domains score higher."""
-    name = domain.split(".")[0]
-    length = len(name)
-    if length <= 5:
-        return 1.0
-    elif length <= 8:
-        return 0.8
-    elif length <= 12:
-        return 0.6
-    elif length <= 16:
-        return 0.4
-    return 0.2
-
-
-def score_domains(
-    client: OpenAI | None,
+    return float(_LEN_TABLE[min(len(domain.split(".", 1)[0]), _MAX_SCORED_LENGTH)])
+
+
+async def score_domains(
+    client: AsyncOpenAI | None,
     model: str,
     available: list[AvailabilityResult],
     trend_velocities: dict[str, float],
     scoring: ScoringConfig,
     skip_llm: bool = False,
 ) -> list[ScoredDomain]:
-    """Score available domains on a 0-100 scale."""
+    """Score available domains on a 0-100 scale.
+
+    Results come back in input order; callers rank only as much as they need.
+    """
     if not available:
         return []
 
+    candidates = [r.candidate for r in available]
+    # Lowercase each brand once, not once per candidate
+    brand_keys = {name: name.lower() for name in {c.original for c in candidates}}
+    keys = [brand_keys[c.original] for c in candidates]
+
     # Get LLM assessments for commercial value and risk
     assessments: dict[str, dict] = {}
     if client and not skip_llm:
-        unique_brands = list({r.candidate.original for r in available})
-        brands_text = ", ".join(unique_brands)
+        brands_text = ", ".join(brand_keys)
 
-        result = chat_json(
+        result = await chat_json_async(
             client, model, SYSTEM_PROMPT,
             f"Assess the following brands for domain investment: {brands_text}",
         )
@@ -100,50 +111,57 @@ def score_domains(
             brand = a.get("brand", "").lower()
             assessments[brand] = a
 
-    scored: list[ScoredDomain] = []
+    llm_data = [assessments.get(key, {}) for key in keys]
 
-    for result in available:
-        c = result.candidate
-        brand_lower = c.original.lower()
+    # 1. Trend Velocity (0-25)
+    velocity = np.array([trend_velocities.get(key, 0.5) for key in keys], dtype=float)
+    trend_score = np.minimum(velocity / 3.0, 1.0) * scoring.trend_velocity_weight
 
-        # 1. Trend Velocity (0-25)
-        velocity = trend_velocities.get(brand_lower, 0.5)
-        trend_score = min(velocity / 3.0, 1.0) * scoring.trend_velocity_weight
+    # 2. Commercial Value (0-25)
+    cpc = np.array([d.get("estimated_cpc", 1.0) for d in llm_data], dtype=float)
+    commercial_score = np.minimum(cpc / 10.0, 1.0) * scoring.commercial_value_weight
 
-        # 2. Commercial Value (0-25)
-        llm_data = assessments.get(brand_lower, {})
-        cpc = llm_data.get("estimated_cpc", 1.0)
-        commercial_score = min(cpc / 10.0, 1.0) * scoring.commercial_value_weight
+    # 3. Typo Plausibility (0-20)
+    confidence = np.array([c.confidence for c in candidates], dtype=float)
+    plausibility_score = confidence * scoring.typo_plausibility_weight
 
-        # 3. Typo Plausibility (0-20)
-        plausibility_score = c.confidence * scoring.typo_plausibility_weight
+    # 4. Domain Quality (0-15)
+    tld_q = np.array([_tld_quality_score(c.tld) for c in candidates], dtype=float)
+    name_lengths = np.array([len(c.domain.split(".", 1)[0]) for c in candidates])
+    len_q = _LEN_TABLE[np.minimum(name_lengths, _MAX_SCORED_LENGTH)]
+    quality_score = ((tld_q + len_q) / 2.0) * scoring.domain_quality_weight
 
-        # 4. Domain Quality (0-15)
-        tld_q = _tld_quality_score(c.tld)
-        len_q = _domain_length_score(c.domain)
-        quality_score = ((tld_q + len_q) / 2.0) * scoring.domain_quality_weight
+    # 5. Risk Penalty (0 to -15)
+    udrp_risk = np.array([d.get("udrp_risk", 3) for d in llm_data], dtype=float)
+    risk_penalty = (udrp_risk / 10.0) ** 1.5 * scoring.risk_penalty_max
 
-        # 5. Risk Penalty (0 to -15)
-        udrp_risk = llm_data.get("udrp_risk", 3)
-        risk_penalty = (udrp_risk / 10.0) ** 1.5 * scoring.risk_penalty_max
+    total = trend_score + commercial_score + plausibility_score + quality_score - risk_penalty
+    total = np.clip(total, 0.0, 100.0)
 
-        total = trend_score + commercial_score + plausibility_score + quality_score - risk_penalty
-        total = max(0.0, min(100.0, total))
-
-        scored.append(ScoredDomain(
+    scored = [
+        ScoredDomain(
             domain=c.domain,
             original=c.original,
             tld=c.tld,
             typo_type=c.typo_type,
-            score=round(total, 1),
+            score=t,
             breakdown={
-                "trend_velocity": round(trend_score, 1),
-                "commercial_value": round(commercial_score, 1),
-                "typo_plausibility": round(plausibility_score, 1),
-                "domain_quality": round(quality_score, 1),
-                "risk_penalty": round(-risk_penalty, 1),
+                "trend_velocity": tv,
+                "commercial_value": cv,
+                "typo_plausibility": tp,
+                "domain_quality": dq,
+                "risk_penalty": rp,
             },
-        ))
+        )
+        for c, t, tv, cv, tp, dq, rp in zip(
+            candidates,
+            total.round(1).tolist(),
+            trend_score.round(1).tolist(),
+            commercial_score.round(1).tolist(),
+            plausibility_score.round(1).tolist(),
+            quality_score.round(1).tolist(),
+            (-risk_penalty).round(1).tolist(),
+        )
+    ]
 
-    scored.sort(key=lambda d: d.score, reverse=True)
     return scored
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import logging
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-from find_domains.llm.client import chat_json
+from find_domains.llm.client import chat_json_async
 from find_domains.trends.google_trends import TrendItem
 
 log = logging.getLogger(__name__)
@@ -37,8 +37,8 @@ Select up to the requested number of targets. Rank them by overall opportunity q
 """
 
 
-def filter_trends(
-    client: OpenAI,
+async def filter_trends(
+    client: AsyncOpenAI,
     model: str,
     trends: list[TrendItem],
     max_targets: int = 50,
@@ -64,7 +64,7 @@ Select the top {max_targets} best typosquatting targets from this list. \
 Focus on names that are genuinely hard to spell and have high commercial value.\
 """
 
-    result = chat_json(client, model, SYSTEM_PROMPT, user_prompt)
+    result = await chat_json_async(client, model, SYSTEM_PROMPT, user_prompt)
 
     targets = result.get("targets", []) if isinstance(result, dict) else []
 
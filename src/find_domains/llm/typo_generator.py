@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import logging
+import math
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-from find_domains.llm.client import chat_json
+from find_domains.llm.client import chat_json_async
 from find_domains.typos.generator import TypoCandidate
 
 log = logging.getLogger(__name__)
@@ -21,52 +22,58 @@ Consider these error types:
 5. **Memory-based errors**: How someone might remember/reconstruct the spelling
 6. **Autocorrect-dodge errors**: Typos that wouldn't be caught by autocorrect
 
-Return your response as JSON:
+Return your response as JSON, keyed by each brand name exactly as given:
 {
-  "typos": [
-    {
-      "typo": "the misspelling",
-      "type": "phonetic|heard_not_read|mobile|speed|memory|autocorrect",
-      "confidence": 0.85,
-      "explanation": "Brief explanation"
-    }
-  ]
+  "brands": {
+    "BrandName": [
+      {
+        "typo": "the misspelling",
+        "type": "phonetic|heard_not_read|mobile|speed|memory|autocorrect",
+        "confidence": 0.85
+      }
+    ]
+  }
 }
 
-Generate EXACTLY 15 typos. Focus on the most plausible ones that real people would actually type.\
+Generate EXACTLY 15 typos per brand. Focus on the most plausible ones that real people would actually type.\
 """
 
+# Brands per request: keeps each completion well under the output token limit
+MAX_BRANDS_PER_REQUEST = 10
 
-def generate_creative_typos(
-    client: OpenAI,
-    model: str,
+
+def _parse_typos(
+    entries: list,
     brand_name: str,
     tlds: list[str],
 ) -> list[TypoCandidate]:
-    """Use LLM to generate creative, human-like typos for a brand name."""
-    user_prompt = f"""\
-Generate the 15 most likely real-human typos for the brand name: "{brand_name}"
-
-Think about how someone might misspell this if they:
-- Heard it in a podcast but never saw it written
-- Were typing quickly on their phone
-- Aren't sure of the exact spelling
-- Have a slight accent affecting pronunciation\
-"""
-
-    result = chat_json(client, model, SYSTEM_PROMPT, user_prompt)
-    typos_raw = result.get("typos", []) if isinstance(result, dict) else []
+    """Turn the LLM's typo entries for one brand into candidates across TLDs.
 
+    Malformed entries (not an object, no string typo, non-numeric confidence)
+    are skipped rather than failing the whole brand.
+    """
     candidates: list[TypoCandidate] = []
     seen: set[str] = set()
 
-    for entry in typos_raw:
-        typo = entry.get("typo", "").lower().strip().replace(" ", "")
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        typo = entry.get("typo", "")
+        if not isinstance(typo, str):
+            continue
+        typo = typo.lower().strip().replace(" ", "")
         if not typo or typo in seen:
             continue
+
+        try:
+            confidence = float(entry.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(confidence):
+            continue
         seen.add(typo)
 
-        confidence = min(max(float(entry.get("confidence", 0.5)), 0.0), 1.0)
+        confidence = min(max(confidence, 0.0), 1.0)
         typo_type = f"llm_{entry.get('type', 'creative')}"
 
         for tld in tlds:
@@ -79,5 +86,53 @@ Think about how someone might misspell this if they:
                 confidence=confidence,
             ))
 
-    log.info("LLM generated %d creative typo candidates for %r", len(candidates), brand_name)
     return candidates
+
+
+def _user_prompt(batch: list[str]) -> str:
+    brands_text = ", ".join(f'"{name}"' for name in batch)
+    return f"""\
+Generate the 15 most likely real-human typos for each of these brand names: {brands_text}
+
+Think about how someone might misspell each name if they:
+- Heard it in a podcast but never saw it written
+- Were typing quickly on their phone
+- Aren't sure of the exact spelling
+- Have a slight accent affecting pronunciation\
+"""
+
+
+async def generate_creative_typos_batch(
+    client: AsyncOpenAI,
+    model: str,
+    brand_names: list[str],
+    tlds: list[str],
+) -> dict[str, list[TypoCandidate]]:
+    """Use LLM to generate creative, human-like typos for several brand names.
+
+    All brands go in a single request, so callers should pass at most
+    MAX_BRANDS_PER_REQUEST at a time. Returns candidates keyed by brand name;
+    brands the LLM skipped, or whose entries could not be parsed, map to an
+    empty list.
+    """
+    by_brand: dict[str, list[TypoCandidate]] = {name: [] for name in brand_names}
+
+    result = await chat_json_async(client, model, SYSTEM_PROMPT, _user_prompt(brand_names))
+    brands_raw = result.get("brands", {}) if isinstance(result, dict) else {}
+    if not isinstance(brands_raw, dict):
+        brands_raw = {}
+
+    # The LLM may not echo the brand's exact casing
+    lookup = {name.lower(): name for name in brand_names}
+    for key, entries in brands_raw.items():
+        name = lookup.get(str(key).lower())
+        if name is None or not isinstance(entries, list):
+            continue
+        try:
+            by_brand[name] = _parse_typos(entries, name, tlds)
+        except Exception:
+            log.debug("Failed to parse LLM typos for %r", name, exc_info=True)
+
+    total = sum(len(c) for c in by_brand.values())
+    log.info("LLM generated %d creative typo candidates for %d brands", total, len(brand_names))
+    return by_brand
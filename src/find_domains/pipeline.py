@@ -1,67 +1,91 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
 import logging
 from pathlib import Path
 
 import click
 
-from find_domains.checker.availability import AvailabilityResult, check_availability
+from find_domains.checker.availability import AvailabilityChecker, AvailabilityResult
 from find_domains.config import Config
-from find_domains.llm.client import get_client
+from find_domains.llm.client import get_async_client
 from find_domains.llm.scorer import ScoredDomain, score_domains
 from find_domains.llm.trend_filter import filter_trends
-from find_domains.llm.typo_generator import generate_creative_typos
+from find_domains.llm.typo_generator import MAX_BRANDS_PER_REQUEST, generate_creative_typos_batch
 from find_domains.report.github_summary import (
     print_summary,
     write_github_summary,
     write_json_report,
 )
-from find_domains.trends.google_trends import TrendItem, fetch_google_trends
-from find_domains.trends.hackernews import fetch_hackernews
+from find_domains.trends.google_trends import TrendItem, fetch_google_trends, merge_trend_items
+from find_domains.trends.hackernews import fetch_hackernews_async
 from find_domains.typos.generator import TypoCandidate, generate_typos
 
 log = logging.getLogger(__name__)
 
 
-def _diversify(scored: list[ScoredDomain], max_per_brand: int) -> list[ScoredDomain]:
-    """Limit results to at most *max_per_brand* entries per original brand."""
+async def _close_async_client() -> None:
+    """Close the shared async OpenAI client so the next loop gets a fresh one.
+
+    Does nothing if no client was created, e.g. when building it failed.
+    """
+    if not get_async_client.cache_info().currsize:
+        return
+    await get_async_client().close()
+    get_async_client.cache_clear()
+
+
+def _diversify(
+    scored: list[ScoredDomain],
+    max_per_brand: int,
+    limit: int | None = None,
+) -> list[ScoredDomain]:
+    """Pick the highest scoring entries, at most *max_per_brand* per original brand.
+
+    *scored* need not be sorted: entries are popped off a heap in descending
+    score order (ties keep input order) until *limit* have been picked.
+    """
+    heap = [(-item.score, i) for i, item in enumerate(scored)]
+    heapq.heapify(heap)
+
+    brand_keys: dict[str, str] = {}  # original -> lowercased, computed once per brand
     brand_counts: dict[str, int] = {}
     diversified: list[ScoredDomain] = []
-    for item in scored:
-        key = item.original.lower()
+    while heap and (limit is None or len(diversified) < limit):
+        item = scored[heapq.heappop(heap)[1]]
+        key = brand_keys.get(item.original)
+        if key is None:
+            key = brand_keys[item.original] = item.original.lower()
         if brand_counts.get(key, 0) < max_per_brand:
             diversified.append(item)
             brand_counts[key] = brand_counts.get(key, 0) + 1
     return diversified
 
 
-def _collect_trends(target: str | None) -> list[TrendItem]:
+async def _collect_trends(target: str | None) -> list[TrendItem]:
     """Stage 1: Collect trends from all sources, or use a manual target."""
     if target:
         click.echo(f"Using manual target: {target}")
         return [TrendItem(name=target, source="manual", velocity=2.0)]
 
     click.echo("Collecting trends...")
-    google = fetch_google_trends()
+    # pytrends is blocking, so it runs in a thread while HN is fetched
+    google, hn = await asyncio.gather(
+        asyncio.to_thread(fetch_google_trends),
+        fetch_hackernews_async(),
+    )
     click.echo(f"  Google Trends: {len(google)} items")
-
-    hn = fetch_hackernews()
     click.echo(f"  Hacker News: {len(hn)} items")
 
     # Merge and deduplicate, keeping highest velocity
-    merged: dict[str, TrendItem] = {}
-    for item in google + hn:
-        key = item.name.lower()
-        if key not in merged or item.velocity > merged[key].velocity:
-            merged[key] = item
-
-    all_trends = list(merged.values())
+    all_trends = merge_trend_items(google, hn)
     click.echo(f"  Total unique trends: {len(all_trends)}")
     return all_trends
 
 
-def _filter_targets(
+async def _filter_targets(
     trends: list[TrendItem],
     cfg: Config,
     skip_llm: bool,
@@ -72,80 +96,107 @@ def _filter_targets(
         return [{"name": t.name} for t in trends[:cfg.max_targets]]
 
     click.echo("Filtering trends with LLM...")
-    client = get_client()
-    targets = filter_trends(client, cfg.openai.filter_model, trends, cfg.max_targets)
+    targets = await filter_trends(
+        get_async_client(), cfg.openai.filter_model, trends, cfg.max_targets,
+    )
     click.echo(f"  Selected {len(targets)} targets")
     return targets
 
 
-def _generate_all_typos(
+async def _generate_all_typos(
     targets: list[dict],
     cfg: Config,
     skip_llm: bool,
+    queue: asyncio.Queue[list[TypoCandidate]],
 ) -> list[TypoCandidate]:
-    """Stage 3: Generate typo candidates (algorithmic + LLM-enhanced)."""
+    """Stage 3: Generate typo candidates (algorithmic + LLM-enhanced).
+
+    Targets are handled in groups of one LLM request each, all in flight at
+    once. Groups are merged in target order, so a domain several brands share
+    goes to the highest ranked one and the output doesn't depend on which
+    request returns first. Each group's candidates are put on *queue* as soon
+    as they are final, so availability checks can start before the slower LLM
+    requests return.
+    """
     click.echo("Generating typo candidates...")
-    all_candidates: list[TypoCandidate] = []
+    by_brand: dict[str, list[TypoCandidate]] = {}
     seen_domains: set[str] = set()
 
     tlds = cfg.tlds_tier1  # Use tier1 TLDs for initial scan
 
-    for target in targets:
-        name = target["name"]
-
-        # Algorithmic typos
-        algo_candidates = generate_typos(name, tlds)
-
-        # LLM-enhanced typos
-        llm_candidates: list[TypoCandidate] = []
-        if not skip_llm:
-            try:
-                client = get_client()
-                llm_candidates = generate_creative_typos(
-                    client, cfg.openai.creative_model, name, tlds,
-                )
-            except Exception:
-                log.warning("LLM typo generation failed for %r", name, exc_info=True)
-
-        # Merge and deduplicate
-        for c in algo_candidates + llm_candidates:
-            if c.domain not in seen_domains:
+    async def creative(names: list[str]) -> dict[str, list[TypoCandidate]]:
+        # LLM-enhanced typos for this group of targets
+        try:
+            return await generate_creative_typos_batch(
+                get_async_client(), cfg.openai.creative_model, names, tlds,
+            )
+        except Exception:
+            log.warning("LLM typo generation failed", exc_info=True)
+            return {}
+
+    def merge(names: list[str], llm_by_brand: dict[str, list[TypoCandidate]]) -> None:
+        for name in names:
+            # Algorithmic typos
+            algo_candidates = generate_typos(name, tlds)
+            llm_candidates = llm_by_brand.get(name, [])
+
+            # Merge and deduplicate, capped per target: a min-heap keeps the
+            # highest confidence ones (earliest wins ties), so a candidate is
+            # rejected as soon as it can't make the cut
+            kept: list[tuple[float, int, TypoCandidate]] = []
+            for order, c in enumerate(itertools.chain(algo_candidates, llm_candidates)):
+                if c.domain in seen_domains:
+                    continue
                 seen_domains.add(c.domain)
-                all_candidates.append(c)
-
-        # Cap per target
-        target_count = sum(1 for c in all_candidates if c.original == name)
-        if target_count > cfg.max_typos_per_target:
-            # Keep only the highest confidence ones for this target
-            target_cands = [c for c in all_candidates if c.original == name]
-            target_cands.sort(key=lambda c: c.confidence, reverse=True)
-            keep = {c.domain for c in target_cands[:cfg.max_typos_per_target]}
-            all_candidates = [
-                c for c in all_candidates
-                if c.original != name or c.domain in keep
-            ]
-
+                entry = (c.confidence, -order, c)
+                if len(kept) < cfg.max_typos_per_target:
+                    heapq.heappush(kept, entry)
+                elif entry[:2] > kept[0][:2]:
+                    heapq.heapreplace(kept, entry)
+            by_brand[name] = [c for *_, c in sorted(kept, key=lambda e: e[:2], reverse=True)]
+
+    names = list(dict.fromkeys(t["name"] for t in targets))
+    groups = [
+        names[start:start + MAX_BRANDS_PER_REQUEST]
+        for start in range(0, len(names), MAX_BRANDS_PER_REQUEST)
+    ]
+    async with asyncio.TaskGroup() as tg:
+        requests = [None if skip_llm else tg.create_task(creative(group)) for group in groups]
+        # Later groups' requests stay in flight while earlier groups are merged
+        for group, request in zip(groups, requests):
+            merge(group, {} if request is None else await request)
+            batch = [c for name in group for c in by_brand[name]]
+            if batch:
+                await queue.put(batch)
+
+    all_candidates = [c for cands in by_brand.values() for c in cands]
     click.echo(f"  Generated {len(all_candidates)} unique candidates")
     return all_candidates
 
 
-def _check_domains(
-    candidates: list[TypoCandidate],
+async def _check_domains(
+    queue: asyncio.Queue[list[TypoCandidate] | None],
     cfg: Config,
 ) -> list[AvailabilityResult]:
-    """Stage 4: Check domain availability."""
-    click.echo(f"Checking availability for {len(candidates)} domains...")
-    results = asyncio.run(check_availability(
-        candidates,
-        dns_delay_ms=cfg.rate_limits.dns_delay_ms,
-        rdap_delay_ms=cfg.rate_limits.rdap_delay_ms,
-    ))
+    """Stage 4: Check domain availability for each batch put on *queue*, until None.
+
+    One checker serves every batch, so the DNS timeout learned and the RDAP
+    connections opened for earlier batches are reused by later ones.
+    """
+    results: list[AvailabilityResult] = []
+    async with AvailabilityChecker(
+        dns_concurrency=cfg.rate_limits.dns_concurrency,
+        rdap_concurrency_per_host=cfg.rate_limits.rdap_concurrency_per_host,
+    ) as checker:
+        while (candidates := await queue.get()) is not None:
+            click.echo(f"Checking availability for {len(candidates)} domains...")
+            results.extend(await checker.check(candidates))
     available = [r for r in results if r.available]
     click.echo(f"  Available: {len(available)} / {len(results)}")
     return available
 
 
-def _score_results(
+async def _score_results(
     available: list[AvailabilityResult],
     trends: list[TrendItem],
     cfg: Config,
@@ -156,8 +207,8 @@ def _score_results(
 
     trend_velocities = {t.name.lower(): t.velocity for t in trends}
 
-    client = None if skip_llm else get_client()
-    scored = score_domains(
+    client = None if skip_llm else get_async_client()
+    scored = await score_domains(
         client,
         cfg.openai.scorer_model,
         available,
@@ -170,44 +221,66 @@ def _score_results(
     return scored
 
 
-def run_pipeline(
+async def _scan(
+    trends: list[TrendItem],
     cfg: Config,
-    target: str | None = None,
-    output_dir: Path = Path("results"),
-    top_n: int = 25,
-    skip_llm: bool = False,
-    max_per_brand: int | None = None,
+    skip_llm: bool,
 ) -> list[ScoredDomain]:
-    """Run the full domain scanning pipeline."""
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
-
-    # Stage 1: Collect trends
-    trends = _collect_trends(target)
-
+    """Stages 2-5: turn collected trends into scored, available domains."""
     # Stage 2: Filter to best targets
-    targets = _filter_targets(trends, cfg, skip_llm)
+    targets = await _filter_targets(trends, cfg, skip_llm)
     if not targets:
         click.echo("No targets found. Exiting.")
         return []
 
-    # Stage 3: Generate typo candidates
-    candidates = _generate_all_typos(targets, cfg, skip_llm)
+    # Stages 3 and 4 overlap: candidates are checked as they are generated
+    queue: asyncio.Queue[list[TypoCandidate] | None] = asyncio.Queue()
+    async with asyncio.TaskGroup() as tg:
+        checking = tg.create_task(_check_domains(queue, cfg))
+        candidates = await _generate_all_typos(targets, cfg, skip_llm, queue)
+        await queue.put(None)
     if not candidates:
         click.echo("No typo candidates generated. Exiting.")
         return []
 
-    # Stage 4: Check availability
-    available = _check_domains(candidates, cfg)
+    available = checking.result()
     if not available:
         click.echo("No available domains found. Exiting.")
         return []
 
     # Stage 5: Score results
-    scored = _score_results(available, trends, cfg, skip_llm)
+    return await _score_results(available, trends, cfg, skip_llm)
+
+
+async def run_pipeline(
+    cfg: Config,
+    target: str | None = None,
+    output_dir: Path = Path("results"),
+    top_n: int = 25,
+    skip_llm: bool = False,
+    max_per_brand: int | None = None,
+) -> list[ScoredDomain]:
+    """Run the full domain scanning pipeline.
+
+    Returns every scored domain, unranked: only the JSON report (fully) and the
+    display list (top_n, via _diversify's heap) are put in score order.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    # Stage 1: Collect trends
+    trends = await _collect_trends(target)
+
+    try:
+        scored = await _scan(trends, cfg, skip_llm)
+    finally:
+        if not skip_llm:
+            await _close_async_client()
+    if not scored:
+        return []
 
     # Stage 6: Diversify for display ranking
     brand_limit = max_per_brand if max_per_brand is not None else cfg.max_per_brand
-    display = _diversify(scored, brand_limit)
+    display = _diversify(scored, brand_limit, top_n)
 
     # Stage 7: Report (JSON gets all results; display list is diversified)
     json_path = write_json_report(scored, output_dir)
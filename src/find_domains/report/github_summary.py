@@ -2,15 +2,17 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import asdict
+from dataclasses import fields
 from datetime import date, timezone, datetime
 from pathlib import Path
 
 from find_domains.llm.scorer import ScoredDomain
 
+_SCORED_FIELDS = tuple(f.name for f in fields(ScoredDomain))
+
 
 def write_json_report(scored: list[ScoredDomain], output_dir: Path) -> Path:
-    """Write full scored results to a JSON file."""
+    """Write full scored results to a JSON file, highest score first."""
     output_dir.mkdir(parents=True, exist_ok=True)
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     path = output_dir / f"{today}.json"
@@ -18,7 +20,12 @@ def write_json_report(scored: list[ScoredDomain], output_dir: Path) -> Path:
     data = {
         "date": today,
         "total_results": len(scored),
-        "domains": [asdict(d) for d in scored],
+        # ScoredDomain holds only primitives and one flat dict, so a shallow
+        # field dump serializes as-is without asdict's recursive deep copy
+        "domains": [
+            {name: getattr(d, name) for name in _SCORED_FIELDS}
+            for d in sorted(scored, key=lambda d: d.score, reverse=True)
+        ],
     }
 
     with open(path, "w") as f:
@@ -1,23 +1,71 @@
 from __future__ import annotations
 
+import itertools
 import logging
+from collections.abc import Iterable
 from dataclasses import dataclass
+from datetime import date
 
 from pytrends.request import TrendReq
 
+from find_domains.cache import get_cache
+
 log = logging.getLogger(__name__)
 
+# Rising queries are cached per day; the TTL just clears out old days
+RELATED_QUERIES_TTL = 24 * 3600
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TrendItem:
     name: str
     source: str
     velocity: float  # relative measure of trend strength
 
 
+def upsert_trend(seen: dict[str, TrendItem], item: TrendItem) -> None:
+    """Add *item* to *seen* (keyed by casefolded name), keeping the highest velocity."""
+    key = item.name.casefold()
+    current = seen.get(key)
+    if current is None or item.velocity > current.velocity:
+        seen[key] = item
+
+
+def merge_trend_items(*iters: Iterable[TrendItem]) -> list[TrendItem]:
+    """Merge trend items from any number of sources in one pass, deduplicated by name."""
+    seen: dict[str, TrendItem] = {}
+    for item in itertools.chain(*iters):
+        upsert_trend(seen, item)
+    return list(seen.values())
+
+
+def _rising_queries(pytrends: TrendReq, kw: str) -> list[tuple[str, float]]:
+    """Top rising (query, value) pairs related to *kw* over the past week.
+
+    Answers are cached on disk per keyword and calendar day, so reruns on the
+    same day skip the request.
+    """
+    cache = get_cache("pytrends")
+    key = (kw, date.today().isoformat())
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    pytrends.build_payload([kw], timeframe="now 7-d")
+    related = pytrends.related_queries()
+    rising = related.get(kw, {}).get("rising")
+    queries: list[tuple[str, float]] = []
+    if rising is not None and not rising.empty:
+        for _, row in rising.head(10).iterrows():
+            queries.append((str(row["query"]).strip(), float(row.get("value", 1))))
+
+    cache.set(key, queries, expire=RELATED_QUERIES_TTL)
+    return queries
+
+
 def fetch_google_trends() -> list[TrendItem]:
     """Fetch today's trending searches and rising queries from Google Trends."""
-    items: list[TrendItem] = []
+    seen: dict[str, TrendItem] = {}
     try:
         pytrends = TrendReq(hl="en-US")
 
@@ -26,35 +74,22 @@ def fetch_google_trends() -> list[TrendItem]:
         for _, row in trending.iterrows():
             name = str(row.iloc[0]).strip()
             if name:
-                items.append(TrendItem(name=name, source="google_trends_daily", velocity=1.0))
+                upsert_trend(seen, TrendItem(name=name, source="google_trends_daily", velocity=1.0))
 
         # Rising queries for tech/business categories
         seed_keywords = ["startup", "app", "software", "AI tool"]
         for kw in seed_keywords:
             try:
-                pytrends.build_payload([kw], timeframe="now 7-d")
-                related = pytrends.related_queries()
-                rising = related.get(kw, {}).get("rising")
-                if rising is not None and not rising.empty:
-                    for _, row in rising.head(10).iterrows():
-                        query = str(row["query"]).strip()
-                        value = float(row.get("value", 1))
-                        items.append(TrendItem(
-                            name=query,
-                            source="google_trends_rising",
-                            velocity=min(value / 100.0, 5.0),
-                        ))
+                for query, value in _rising_queries(pytrends, kw):
+                    upsert_trend(seen, TrendItem(
+                        name=query,
+                        source="google_trends_rising",
+                        velocity=min(value / 100.0, 5.0),
+                    ))
             except Exception:
                 log.debug("Failed to fetch rising queries for %r", kw, exc_info=True)
 
     except Exception:
         log.warning("Google Trends fetch failed", exc_info=True)
 
-    # Deduplicate by lowercased name, keeping highest velocity
-    seen: dict[str, TrendItem] = {}
-    for item in items:
-        key = item.name.lower()
-        if key not in seen or item.velocity > seen[key].velocity:
-            seen[key] = item
-
     return list(seen.values())
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
+from contextlib import AsyncExitStack
 
 import httpx
 
-from find_domains.trends.google_trends import TrendItem
+from find_domains.cache import get_cache
+from find_domains.trends.google_trends import TrendItem, merge_trend_items
 
 log = logging.getLogger(__name__)
 
 HN_TOP_URL = "https://hacker-news.firebaseio.com/v0/topstories.json"
 HN_ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{}.json"
 
+# Scores move quickly, so a story's (title, score) is only reused briefly
+HN_ITEM_TTL = 300
+
 # Words unlikely to be brand names
 STOP_WORDS = frozenset({
     "the", "a", "an", "is", "are", "was", "were", "how", "why", "what",
@@ -21,63 +27,115 @@ STOP_WORDS = frozenset({
     "now", "get", "got", "use", "way", "who", "hn", "yc",
 })
 
-# Pattern to extract likely brand/product names: capitalized words or known patterns
-BRAND_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\.[a-z]+)*\b")
+# STOP_WORDS as BRAND_PATTERN can match them ("Show", "HOW"), so tokens can be
+# checked as-is instead of lowercasing each one first
+_STOP_TOKENS = frozenset(
+    form for word in STOP_WORDS for form in (word.capitalize(), word.upper())
+)
+
+# Pattern to extract likely brand/product names: capitalized words or known
+# patterns, plus all-caps short words (acronyms like "GPT"), in one pass. Both
+# alternatives only match tokens of 3+ characters, so shorter ones ("Go",
+# "AI") never get a match object or string built for them.
+BRAND_PATTERN = re.compile(
+    r"\b[A-Z][a-z](?:[a-z]|\.[a-z])[a-z]*(?:\.[a-z]+)*\b|\b[A-Z]{3,6}\b"
+)
 
 
 def _extract_brands(title: str) -> list[str]:
     """Extract potential brand/product names from a HN title."""
-    # Find capitalized words that could be brand names
-    matches = BRAND_PATTERN.findall(title)
-    # Also look for all-caps short words (acronyms like "AI", "GPT")
-    acronyms = re.findall(r"\b[A-Z]{2,6}\b", title)
-
     candidates = []
-    for m in matches + acronyms:
-        cleaned = m.strip().lower()
-        if cleaned not in STOP_WORDS and len(cleaned) >= 3:
-            candidates.append(m.strip())
+    for m in BRAND_PATTERN.finditer(title):
+        token = m.group()
+        if token not in _STOP_TOKENS:
+            candidates.append(token)
 
     return candidates
 
 
-def fetch_hackernews(max_stories: int = 60) -> list[TrendItem]:
-    """Fetch top HN stories and extract brand/product names."""
+# Concurrent item fetches; matches the client's keep-alive pool size
+HN_CONCURRENCY = 20
+
+
+async def _fetch_story(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    story_id: int,
+) -> list[TrendItem]:
+    """Fetch one HN story and turn the brands in its title into trend items.
+
+    The story's title and score are cached on disk for HN_ITEM_TTL seconds.
+    """
+    cache = get_cache("hn")
+    cached = cache.get(story_id)
+    if cached is not None:
+        title, score = cached
+    else:
+        try:
+            async with sem:
+                r = await client.get(HN_ITEM_URL.format(story_id))
+            r.raise_for_status()
+            story = r.json() or {}
+        except Exception:
+            log.debug("Failed to fetch HN story %s", story_id, exc_info=True)
+            return []
+
+        title = story.get("title", "")
+        score = story.get("score", 0)
+        cache.set(story_id, (title, score), expire=HN_ITEM_TTL)
+
+    velocity = min(score / 200.0, 3.0)
+    return [
+        TrendItem(name=brand, source="hackernews", velocity=velocity)
+        for brand in _extract_brands(title)
+    ]
+
+
+def hn_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for the HN API."""
+    limits = httpx.Limits(max_keepalive_connections=HN_CONCURRENCY, max_connections=50)
+    return httpx.AsyncClient(http2=True, limits=limits, timeout=15)
+
+
+async def fetch_hackernews_async(
+    max_stories: int = 60,
+    client: httpx.AsyncClient | None = None,
+) -> list[TrendItem]:
+    """Fetch top HN stories and extract brand/product names.
+
+    Stories are fetched concurrently over one pooled client. Callers polling
+    repeatedly can pass their own *client* (see hn_client) to keep its
+    connections alive between calls; otherwise one is opened for this call.
+    """
     items: list[TrendItem] = []
 
     try:
-        with httpx.Client(timeout=15) as client:
-            resp = client.get(HN_TOP_URL)
+        async with AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(hn_client())
+
+            # Ask Firebase for just the first max_stories IDs, not all ~500
+            resp = await client.get(HN_TOP_URL, params={
+                "orderBy": '"$key"', "limitToFirst": max_stories,
+            })
             resp.raise_for_status()
-            story_ids = resp.json()[:max_stories]
-
-            for story_id in story_ids:
-                try:
-                    r = client.get(HN_ITEM_URL.format(story_id))
-                    r.raise_for_status()
-                    story = r.json()
-                    title = story.get("title", "")
-                    score = story.get("score", 0)
-
-                    brands = _extract_brands(title)
-                    for brand in brands:
-                        velocity = min(score / 200.0, 3.0)
-                        items.append(TrendItem(
-                            name=brand,
-                            source="hackernews",
-                            velocity=velocity,
-                        ))
-                except Exception:
-                    log.debug("Failed to fetch HN story %s", story_id, exc_info=True)
+            story_ids = resp.json()
+            if isinstance(story_ids, dict):
+                # Firebase returns an object instead of an array if keys have gaps
+                story_ids = [story_ids[k] for k in sorted(story_ids, key=int)]
+            story_ids = story_ids[:max_stories]
+
+            sem = asyncio.Semaphore(HN_CONCURRENCY)
+            items = merge_trend_items(*await asyncio.gather(*[
+                _fetch_story(client, sem, story_id) for story_id in story_ids
+            ]))
 
     except Exception:
         log.warning("Hacker News fetch failed", exc_info=True)
 
-    # Deduplicate
-    seen: dict[str, TrendItem] = {}
-    for item in items:
-        key = item.name.lower()
-        if key not in seen or item.velocity > seen[key].velocity:
-            seen[key] = item
+    return items
+
 
-    return list(seen.values())
+def fetch_hackernews(max_stories: int = 60) -> list[TrendItem]:
+    """Synchronous wrapper around fetch_hackernews_async for callers without a loop."""
+    return asyncio.run(fetch_hackernews_async(max_stories))
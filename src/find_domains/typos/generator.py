@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+import itertools
+import re
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import lru_cache
+
+from find_domains.cache import get_cache
 
 # QWERTY keyboard adjacency map
 QWERTY_NEIGHBORS: dict[str, str] = {
@@ -12,6 +19,12 @@ QWERTY_NEIGHBORS: dict[str, str] = {
     "b": "vghn", "n": "bhjm", "m": "njk",
 }
 
+# QWERTY_NEIGHBORS indexed by ASCII code, for both cases of each letter
+_NEIGHBORS_BY_ORD: list[str] = [""] * 128
+for _key, _neighbors in QWERTY_NEIGHBORS.items():
+    _NEIGHBORS_BY_ORD[ord(_key)] = _NEIGHBORS_BY_ORD[ord(_key.upper())] = _neighbors
+del _key, _neighbors
+
 # Common visual/phonetic substitutions
 HOMOGLYPHS: dict[str, list[str]] = {
     "l": ["1", "i"],
@@ -34,8 +47,16 @@ HOMOGLYPHS: dict[str, list[str]] = {
     "w": ["vv"],
 }
 
+# All multi-character HOMOGLYPHS keys, found in a single scan. The lookahead
+# keeps overlapping occurrences (e.g. both "vv" in "vvv"). It captures only one
+# key per start position, so multi-character keys must not share a prefix
+# ("rn" and "rnn" could not both match at the same place).
+MULTI_CHAR_HOMOGLYPH_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(p) for p in HOMOGLYPHS if len(p) > 1) + "))"
+)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TypoCandidate:
     domain: str       # e.g. "gogle.com"
     original: str     # e.g. "google"
@@ -44,76 +65,97 @@ class TypoCandidate:
     confidence: float  # 0.0-1.0, how plausible this typo is
 
 
-def _omissions(name: str) -> list[tuple[str, str]]:
+# Each edit helper records what it yields in ``seen`` (by default a fresh set
+# holding just the name) and skips anything already there. Helpers sharing one
+# set therefore never yield the same typo twice.
+
+
+def _omissions(name: str, seen: set[str] | None = None) -> Iterator[tuple[str, str]]:
     """Drop each character one at a time."""
-    results = []
+    if seen is None:
+        seen = {name}
     for i in range(len(name)):
         typo = name[:i] + name[i + 1:]
-        if typo and typo != name:
-            results.append((typo, "omission"))
-    return results
+        if typo and typo not in seen:
+            seen.add(typo)
+            yield (typo, "omission")
 
 
-def _doublings(name: str) -> list[tuple[str, str]]:
+def _doublings(name: str, seen: set[str] | None = None) -> Iterator[tuple[str, str]]:
     """Double each character."""
-    results = []
+    if seen is None:
+        seen = {name}
     for i in range(len(name)):
-        typo = name[:i] + name[i] * 2 + name[i + 1:]
-        if typo != name:
-            results.append((typo, "doubling"))
-    return results
+        # name[:i] + name[i] * 2 + name[i + 1:], with one concatenation
+        typo = name[:i + 1] + name[i:]
+        if typo not in seen:
+            seen.add(typo)
+            yield (typo, "doubling")
 
 
-def _transpositions(name: str) -> list[tuple[str, str]]:
+def _transpositions(
+    name: str, seen: set[str] | None = None
+) -> Iterator[tuple[str, str]]:
     """Swap adjacent character pairs."""
-    results = []
+    if seen is None:
+        seen = {name}
     for i in range(len(name) - 1):
-        chars = list(name)
-        chars[i], chars[i + 1] = chars[i + 1], chars[i]
-        typo = "".join(chars)
-        if typo != name:
-            results.append((typo, "transposition"))
-    return results
+        # Swapping equal characters would give back the name itself
+        if name[i] != name[i + 1]:
+            typo = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+            if typo not in seen:
+                seen.add(typo)
+                yield (typo, "transposition")
 
 
-def _adjacent_keys(name: str) -> list[tuple[str, str]]:
+def _adjacent_keys(
+    name: str, seen: set[str] | None = None
+) -> Iterator[tuple[str, str]]:
     """Replace each character with its QWERTY neighbors."""
-    results = []
-    for i in range(len(name)):
-        ch = name[i].lower()
-        neighbors = QWERTY_NEIGHBORS.get(ch, "")
+    if seen is None:
+        seen = {name}
+    for i, ch in enumerate(name):
+        code = ord(ch)
+        neighbors = _NEIGHBORS_BY_ORD[code] if code < 128 else ""
+        if not neighbors:
+            continue
+        # Slice once per position, not once per neighbor
+        head, tail = name[:i], name[i + 1:]
         for neighbor in neighbors:
-            typo = name[:i] + neighbor + name[i + 1:]
-            if typo != name:
-                results.append((typo, "adjacent_key"))
-    return results
+            typo = head + neighbor + tail
+            if typo not in seen:
+                seen.add(typo)
+                yield (typo, "adjacent_key")
 
 
-def _homoglyph_subs(name: str) -> list[tuple[str, str]]:
+def _homoglyph_subs(
+    name: str, seen: set[str] | None = None
+) -> Iterator[tuple[str, str]]:
     """Apply homoglyph/visual substitutions."""
-    results = []
-
+    if seen is None:
+        seen = {name}
     # Single character substitutions
-    for i in range(len(name)):
-        ch = name[i].lower()
-        for replacement in HOMOGLYPHS.get(ch, []):
+    for i, ch in enumerate(name):
+        replacements = HOMOGLYPHS.get(ch.lower())
+        if not replacements:
+            continue
+        head, tail = name[:i], name[i + 1:]
+        for replacement in replacements:
             if len(replacement) == 1:
-                typo = name[:i] + replacement + name[i + 1:]
-                if typo != name:
-                    results.append((typo, "homoglyph"))
+                typo = head + replacement + tail
+                if typo not in seen:
+                    seen.add(typo)
+                    yield (typo, "homoglyph")
 
     # Multi-character pattern substitutions (e.g., rn→m)
-    for pattern, replacements in HOMOGLYPHS.items():
-        if len(pattern) > 1:
-            for replacement in replacements:
-                idx = name.find(pattern)
-                while idx != -1:
-                    typo = name[:idx] + replacement + name[idx + len(pattern):]
-                    if typo != name:
-                        results.append((typo, "homoglyph"))
-                    idx = name.find(pattern, idx + 1)
-
-    return results
+    for m in MULTI_CHAR_HOMOGLYPH_PATTERN.finditer(name):
+        pattern = m.group(1)
+        head, tail = name[:m.start()], name[m.start() + len(pattern):]
+        for replacement in HOMOGLYPHS[pattern]:
+            typo = head + replacement + tail
+            if typo not in seen:
+                seen.add(typo)
+                yield (typo, "homoglyph")
 
 
 # Confidence scores by typo type (how likely a real human makes this typo)
@@ -129,51 +171,83 @@ TYPO_CONFIDENCE: dict[str, float] = {
 
 def generate_typos(name: str, tlds: list[str]) -> list[TypoCandidate]:
     """Generate all algorithmic typo candidates for a brand name across TLDs."""
+    return list(_generate_typos(name, tuple(tlds)))
+
+
+# Generated typos are kept on disk across runs. Cache keys carry
+# TYPO_CACHE_VERSION, which must be bumped whenever the edit helpers change, and
+# a digest of the lookup tables, so edits to either never serve stale entries.
+TYPO_CACHE_VERSION = 1
+TYPO_CACHE_TTL = 7 * 24 * 3600
+_TABLES_DIGEST = hashlib.sha256(
+    repr((QWERTY_NEIGHBORS, HOMOGLYPHS, TYPO_CONFIDENCE)).encode()
+).hexdigest()[:16]
+
+
+# Candidates are frozen, so cached results can be shared between callers
+@lru_cache(maxsize=4096)
+def _generate_typos(name: str, tlds: tuple[str, ...]) -> tuple[TypoCandidate, ...]:
+    """Typo candidates for *name*, loaded from the "typos" disk cache if present.
+
+    Rows are stored as plain (domain, tld, typo_type, confidence) tuples, which
+    load much faster than pickled candidates.
+    """
+    cache = get_cache("typos")
+    key = (TYPO_CACHE_VERSION, _TABLES_DIGEST, name, tlds)
+    rows = cache.get(key)
+    if rows is not None:
+        return tuple(
+            TypoCandidate(domain, name, tld, typo_type, confidence)
+            for domain, tld, typo_type, confidence in rows
+        )
+
+    candidates = _build_typos(name, tlds)
+    cache.set(
+        key,
+        [(c.domain, c.tld, c.typo_type, c.confidence) for c in candidates],
+        expire=TYPO_CACHE_TTL,
+    )
+    return candidates
+
+
+def _build_typos(name: str, tlds: tuple[str, ...]) -> tuple[TypoCandidate, ...]:
     name_clean = name.lower().replace(" ", "").replace("-", "").replace(".", "")
 
-    raw_typos: list[tuple[str, str]] = []
-    raw_typos.extend(_omissions(name_clean))
-    raw_typos.extend(_doublings(name_clean))
-    raw_typos.extend(_transpositions(name_clean))
-    raw_typos.extend(_adjacent_keys(name_clean))
-    raw_typos.extend(_homoglyph_subs(name_clean))
-
-    # Deduplicate raw typos
-    seen_typos: set[str] = set()
-    unique_typos: list[tuple[str, str]] = []
-    for typo, typo_type in raw_typos:
-        if typo not in seen_typos and typo != name_clean:
-            seen_typos.add(typo)
-            unique_typos.append((typo, typo_type))
-
-    # Generate candidates across TLDs
-    candidates: list[TypoCandidate] = []
-    seen_domains: set[str] = set()
-
-    for typo, typo_type in unique_typos:
+    # One pass: each new edit goes straight into the candidate map, keyed by
+    # final domain. The helpers share seen_typos, so everything they yield is
+    # new; a typo produced by several edits keeps the first one's type.
+    seen_typos = {name_clean}
+    edits = itertools.chain(
+        _omissions(name_clean, seen_typos),
+        _doublings(name_clean, seen_typos),
+        _transpositions(name_clean, seen_typos),
+        _adjacent_keys(name_clean, seen_typos),
+        _homoglyph_subs(name_clean, seen_typos),
+    )
+    candidates: dict[str, TypoCandidate] = {}
+    for typo, typo_type in edits:
+        confidence = TYPO_CONFIDENCE.get(typo_type, 0.5)
         for tld in tlds:
             domain = f"{typo}{tld}"
-            if domain not in seen_domains:
-                seen_domains.add(domain)
-                candidates.append(TypoCandidate(
+            if domain not in candidates:
+                candidates[domain] = TypoCandidate(
                     domain=domain,
                     original=name,
                     tld=tld,
                     typo_type=typo_type,
-                    confidence=TYPO_CONFIDENCE.get(typo_type, 0.5),
-                ))
+                    confidence=confidence,
+                )
 
     # Also add the original name on different TLDs (TLD swap)
     for tld in tlds:
         domain = f"{name_clean}{tld}"
-        if domain not in seen_domains:
-            seen_domains.add(domain)
-            candidates.append(TypoCandidate(
+        if domain not in candidates:
+            candidates[domain] = TypoCandidate(
                 domain=domain,
                 original=name,
                 tld=tld,
                 typo_type="tld_swap",
                 confidence=TYPO_CONFIDENCE["tld_swap"],
-            ))
+            )
 
-    return candidates
+    return tuple(candidates.values())
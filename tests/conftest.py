@@ -0,0 +1,12 @@
+import pytest
+
+from find_domains.cache import get_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point on-disk caches at a per-test directory."""
+    monkeypatch.setenv("FIND_DOMAINS_CACHE_DIR", str(tmp_path / "cache"))
+    get_cache.cache_clear()
+    yield
+    get_cache.cache_clear()
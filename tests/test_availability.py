@@ -1,33 +1,153 @@
 import asyncio
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
-import dns.resolver
+import aiodns
+import httpx
 
-from find_domains.checker.availability import _check_dns, check_availability, AvailabilityResult
+from find_domains.cache import get_cache
+from find_domains.checker.availability import (
+    DNS_INITIAL_TIMEOUT,
+    DNS_MAX_TIMEOUT,
+    DNS_MIN_TIMEOUT,
+    RDAP_TTL_UNREGISTERED,
+    DnsRtt,
+    _check_dns,
+    _check_rdap,
+    _rdap_ttl,
+    check_availability,
+    AvailabilityChecker,
+    AvailabilityResult,
+)
 from find_domains.typos.generator import TypoCandidate
 
 
+def _mock_resolver(**query_kwargs) -> MagicMock:
+    resolver = MagicMock()
+    resolver.query_dns = AsyncMock(**query_kwargs)
+    return resolver
+
+
 class TestCheckDns:
     def test_nxdomain_returns_false(self):
         """A domain that doesn't exist should return False."""
-        with patch("find_domains.checker.availability.dns.resolver.Resolver") as MockResolver:
-            instance = MockResolver.return_value
-            instance.resolve.side_effect = dns.resolver.NXDOMAIN()
-            assert _check_dns("thisdoesnotexist12345.com") is False
+        resolver = _mock_resolver(side_effect=aiodns.error.DNSError(
+            aiodns.error.ARES_ENOTFOUND, "Domain name not found",
+        ))
+        assert asyncio.run(_check_dns(resolver, "thisdoesnotexist12345.com")) is False
 
     def test_has_records_returns_true(self):
         """A domain with DNS records should return True."""
-        with patch("find_domains.checker.availability.dns.resolver.Resolver") as MockResolver:
-            instance = MockResolver.return_value
-            instance.resolve.return_value = MagicMock()  # Some records
-            assert _check_dns("example.com") is True
+        resolver = _mock_resolver(return_value=MagicMock())  # Some records
+        assert asyncio.run(_check_dns(resolver, "example.com")) is True
 
     def test_timeout_returns_false(self):
         """DNS timeout should return False (no records found)."""
-        with patch("find_domains.checker.availability.dns.resolver.Resolver") as MockResolver:
-            instance = MockResolver.return_value
-            instance.resolve.side_effect = dns.exception.Timeout()
-            assert _check_dns("slow-domain.com") is False
+        resolver = _mock_resolver(side_effect=aiodns.error.DNSError(
+            aiodns.error.ARES_ETIMEOUT, "Timeout while contacting DNS servers",
+        ))
+        assert asyncio.run(_check_dns(resolver, "slow-domain.com")) is False
+
+    def test_any_record_type_counts(self):
+        """A single answering record type is enough to mark the domain taken."""
+        nxdomain = aiodns.error.DNSError(aiodns.error.ARES_ENOTFOUND, "Domain name not found")
+        resolver = _mock_resolver(side_effect=[nxdomain, nxdomain, MagicMock()])
+        assert asyncio.run(_check_dns(resolver, "mail-only.com")) is True
+
+    def test_no_answer_means_domain_exists(self):
+        """NoAnswer means the zone exists even without records of that type."""
+        resolver = _mock_resolver(side_effect=aiodns.error.DNSError(
+            aiodns.error.ARES_ENODATA, "DNS server returned answer with no data",
+        ))
+        assert asyncio.run(_check_dns(resolver, "parked.com")) is True
+
+    def test_skips_cname(self):
+        resolver = _mock_resolver(return_value=MagicMock())
+        asyncio.run(_check_dns(resolver, "example.com"))
+        queried = {call.args[1] for call in resolver.query_dns.call_args_list}
+        assert "CNAME" not in queried
+
+    def test_first_answer_cancels_slow_queries(self):
+        """A fast answer should not wait on record types that are still pending."""
+        async def query(domain, rdtype):
+            if rdtype == "A":
+                return MagicMock()
+            await asyncio.sleep(10)
+
+        resolver = MagicMock()
+        resolver.query_dns = query
+
+        async def run():
+            return await asyncio.wait_for(_check_dns(resolver, "example.com"), timeout=1)
+
+        assert asyncio.run(run()) is True
+
+    def test_timed_out_attempt_is_retried(self):
+        """A query that outlives the adaptive timeout gets one longer retry."""
+        calls = {"A": 0}
+
+        async def query(domain, rdtype):
+            if rdtype == "A":
+                calls["A"] += 1
+                await asyncio.sleep(1 if calls["A"] == 1 else 0)
+                return MagicMock()
+            raise aiodns.error.DNSError(aiodns.error.ARES_ENOTFOUND, "Domain name not found")
+
+        resolver = MagicMock()
+        resolver.query_dns = query
+
+        # NXDOMAIN answers arrive instantly, so the RTT estimate stays tiny
+        rtt = DnsRtt(avg=0.01)
+        assert asyncio.run(_check_dns(resolver, "example.com", rtt)) is True
+        assert calls["A"] == 2
+
+
+class TestDnsRtt:
+    def test_initial_timeout(self):
+        assert DnsRtt().timeout == DNS_INITIAL_TIMEOUT
+
+    def test_timeout_tracks_rtt_within_bounds(self):
+        assert DnsRtt(avg=0.001).timeout == DNS_MIN_TIMEOUT
+        assert DnsRtt(avg=0.1).timeout == 0.5
+        assert DnsRtt(avg=10.0).timeout == DNS_MAX_TIMEOUT
+
+    def test_observe_smooths(self):
+        rtt = DnsRtt()
+        rtt.observe(0.1)
+        assert rtt.avg == 0.1
+        rtt.observe(1.1)
+        assert 0.1 < rtt.avg < 1.1
+
+
+class TestCheckRdap:
+    def _client(self, status_code, calls, headers=None):
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(status_code, headers=headers)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def _check(self, status_code, calls, headers=None):
+        async with self._client(status_code, calls, headers) as client:
+            return await _check_rdap(client, "gogle.com", ".com")
+
+    def test_cache_hit_skips_request(self):
+        """A cached answer should be returned without hitting the RDAP server."""
+        calls = []
+        assert asyncio.run(self._check(404, calls)) is False
+        assert asyncio.run(self._check(200, calls)) is False
+        assert len(calls) == 1
+
+    def test_errors_not_cached(self):
+        """Inconclusive responses should be retried on the next run."""
+        calls = []
+        assert asyncio.run(self._check(503, calls)) is None
+        assert asyncio.run(self._check(200, calls)) is True
+        assert len(calls) == 2
+        assert get_cache("rdap").get("gogle.com") is True
+
+    def test_ttl_respects_max_age(self):
+        resp = httpx.Response(200, headers={"Cache-Control": "public, max-age=300"})
+        assert _rdap_ttl(resp, registered=True) == 300
+        assert _rdap_ttl(httpx.Response(404), registered=False) == RDAP_TTL_UNREGISTERED
 
 
 class TestCheckAvailability:
@@ -39,7 +159,7 @@ class TestCheckAvailability:
         )
 
         with patch("find_domains.checker.availability._check_dns", return_value=True):
-            results = asyncio.run(check_availability([candidate], dns_delay_ms=0, rdap_delay_ms=0))
+            results = asyncio.run(check_availability([candidate]))
 
         assert len(results) == 1
         assert results[0].available is False
@@ -54,7 +174,7 @@ class TestCheckAvailability:
 
         with patch("find_domains.checker.availability._check_dns", return_value=False), \
              patch("find_domains.checker.availability._check_rdap", return_value=False):
-            results = asyncio.run(check_availability([candidate], dns_delay_ms=0, rdap_delay_ms=0))
+            results = asyncio.run(check_availability([candidate]))
 
         assert len(results) == 1
         assert results[0].available is True
@@ -70,7 +190,7 @@ class TestCheckAvailability:
         dns_results = [True, False, True, False, False]
 
         call_count = 0
-        def mock_dns(domain):
+        def mock_dns(resolver, domain, rtt):
             nonlocal call_count
             result = dns_results[call_count]
             call_count += 1
@@ -78,8 +198,71 @@ class TestCheckAvailability:
 
         with patch("find_domains.checker.availability._check_dns", side_effect=mock_dns), \
              patch("find_domains.checker.availability._check_rdap", return_value=False):
-            results = asyncio.run(check_availability(candidates, dns_delay_ms=0, rdap_delay_ms=0))
+            results = asyncio.run(check_availability(candidates))
 
         assert len(results) == 5
         available = [r for r in results if r.available]
         assert len(available) == 3  # 3 passed DNS check, all confirmed by RDAP
+
+    def test_rdap_answers_map_back_across_servers(self):
+        """Lookups grouped per RDAP server should land on the right candidates."""
+        candidates = [
+            TypoCandidate(domain=f"test{tld}", original="test", tld=tld,
+                          typo_type="omission", confidence=0.8)
+            for tld in (".com", ".io", ".unknown", ".app", ".dev", ".com")
+        ]
+        registered = {"test.io", "test.dev"}
+        hosts_seen = {}
+
+        async def mock_rdap(client, domain, tld):
+            hosts_seen.setdefault(tld, client)
+            return domain in registered
+
+        with patch("find_domains.checker.availability._check_dns", return_value=False), \
+             patch("find_domains.checker.availability._check_rdap", side_effect=mock_rdap):
+            results = asyncio.run(check_availability(candidates))
+
+        assert [r.rdap_registered for r in results] == [False, True, None, False, True, False]
+        assert ".unknown" not in hosts_seen
+        assert hosts_seen[".app"] is hosts_seen[".dev"]
+        assert hosts_seen[".com"] is not hosts_seen[".io"]
+
+    def test_checker_reuses_state_across_batches(self):
+        """Later batches keep the resolver, RTT estimate and RDAP clients of earlier ones."""
+        def batch(*domains):
+            return [
+                TypoCandidate(domain=d, original="test", tld="." + d.split(".")[1],
+                              typo_type="omission", confidence=0.8)
+                for d in domains
+            ]
+
+        dns_state = set()
+        rdap_clients = {}
+
+        async def mock_dns(resolver, domain, rtt):
+            dns_state.add((id(resolver), id(rtt)))
+            return False
+
+        async def mock_rdap(client, domain, tld):
+            rdap_clients.setdefault(tld, set()).add(id(client))
+            return False
+
+        async def run():
+            async with AvailabilityChecker() as checker:
+                first = await checker.check(batch("a.com", "a.io"))
+                second = await checker.check(batch("b.com", "b.io", "c.com"))
+            return first + second
+
+        resolver = MagicMock()
+        resolver.close = AsyncMock()
+        with patch("find_domains.checker.availability.aiodns.DNSResolver", return_value=resolver) as make_resolver, \
+             patch("find_domains.checker.availability._check_dns", side_effect=mock_dns), \
+             patch("find_domains.checker.availability._check_rdap", side_effect=mock_rdap):
+            results = asyncio.run(run())
+
+        assert len(results) == 5
+        assert make_resolver.call_count == 1
+        resolver.close.assert_awaited_once()
+        assert len(dns_state) == 1
+        assert all(len(clients) == 1 for clients in rdap_clients.values())
+        assert rdap_clients[".com"] != rdap_clients[".io"]
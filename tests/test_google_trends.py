@@ -0,0 +1,53 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from find_domains.trends.google_trends import _rising_queries
+
+
+def _pytrends() -> MagicMock:
+    pytrends = MagicMock()
+    pytrends.related_queries.return_value = {
+        "startup": {"rising": pd.DataFrame({"query": [" Vercel ", "Notion"], "value": [250, 80]})},
+    }
+    return pytrends
+
+
+def _on(day: date):
+    today = MagicMock()
+    today.today.return_value = day
+    return patch("find_domains.trends.google_trends.date", today)
+
+
+class TestRisingQueries:
+    def test_same_day_served_from_cache(self):
+        first, second = _pytrends(), _pytrends()
+        with _on(date(2026, 10, 15)):
+            assert _rising_queries(first, "startup") == [("Vercel", 250.0), ("Notion", 80.0)]
+            assert _rising_queries(second, "startup") == [("Vercel", 250.0), ("Notion", 80.0)]
+
+        first.build_payload.assert_called_once_with(["startup"], timeframe="now 7-d")
+        second.build_payload.assert_not_called()
+        second.related_queries.assert_not_called()
+
+    def test_next_day_misses_cache(self):
+        pytrends = _pytrends()
+        with _on(date(2026, 10, 15)):
+            _rising_queries(pytrends, "startup")
+        with _on(date(2026, 10, 16)):
+            _rising_queries(pytrends, "startup")
+
+        assert pytrends.related_queries.call_count == 2
+
+    def test_failures_not_cached(self):
+        failing = _pytrends()
+        failing.build_payload.side_effect = RuntimeError("429 Too Many Requests")
+        retry = _pytrends()
+        with _on(date(2026, 10, 15)):
+            with pytest.raises(RuntimeError):
+                _rising_queries(failing, "startup")
+            assert _rising_queries(retry, "startup") == [("Vercel", 250.0), ("Notion", 80.0)]
+
+        retry.build_payload.assert_called_once()
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from find_domains.cache import get_cache
+from find_domains.trends.hackernews import _extract_brands, fetch_hackernews_async
+
+
+class TestExtractBrands:
+    def test_skips_short_tokens_and_stop_words(self):
+        assert _extract_brands("Show HN: Stripe and Go.js beat AI at YC with GPT") == [
+            "Stripe", "Go.js", "GPT",
+        ]
+
+
+class TestFetchHackernews:
+    TITLES = {1: "Stripe raises", 2: "Vercel ships", 3: "Notion launches"}
+
+    def _run(self, top_stories, requests, max_stories=60):
+        def handler(request):
+            requests.append(request)
+            if request.url.path.endswith("/topstories.json"):
+                return httpx.Response(200, json=top_stories)
+            story_id = int(request.url.path.rsplit("/", 1)[1].removesuffix(".json"))
+            return httpx.Response(200, json={"title": self.TITLES[story_id], "score": 100})
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await fetch_hackernews_async(max_stories, client=client)
+
+        return asyncio.run(run())
+
+    def test_requests_only_first_stories(self):
+        requests = []
+        items = self._run([1, 2], requests, max_stories=2)
+
+        top = requests[0]
+        assert top.url.params["orderBy"] == '"$key"'
+        assert top.url.params["limitToFirst"] == "2"
+        assert [i.name for i in items] == ["Stripe", "Vercel"]
+        assert all(i.velocity == 0.5 for i in items)
+
+    def test_dict_response_ordered_by_key(self):
+        """Firebase answers with an object when keys have gaps; order must follow the keys."""
+        requests = []
+        items = self._run({"10": 3, "2": 1, "1": 2}, requests)
+
+        assert [i.name for i in items] == ["Vercel", "Stripe", "Notion"]
+
+    def test_cached_story_skips_item_request(self):
+        get_cache("hn").set(1, ("Figma ships", 400))
+        requests = []
+        items = self._run([1, 2], requests)
+
+        item_paths = [r.url.path for r in requests[1:]]
+        assert item_paths == ["/v0/item/2.json"]
+        assert [(i.name, i.velocity) for i in items] == [("Figma", 2.0), ("Vercel", 0.5)]
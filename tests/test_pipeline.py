@@ -1,13 +1,18 @@
+import asyncio
 import json
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
 
 from find_domains.config import Config, ScoringConfig
 from find_domains.llm.scorer import ScoredDomain, score_domains, _tld_quality_score, _domain_length_score
-from find_domains.checker.availability import AvailabilityResult
-from find_domains.pipeline import _diversify
+from find_domains.llm.typo_generator import generate_creative_typos_batch
+from find_domains.checker.availability import AvailabilityChecker, AvailabilityResult
+from find_domains.llm.client import get_async_client
+from find_domains.pipeline import _close_async_client, _diversify, _generate_all_typos, _scan, run_pipeline
 from find_domains.report.github_summary import format_summary_table, write_json_report
-from find_domains.trends.google_trends import TrendItem
+from find_domains.trends.google_trends import TrendItem, merge_trend_items
 from find_domains.typos.generator import TypoCandidate
 
 
@@ -27,7 +32,7 @@ class TestScorer:
         velocities = {"google": 2.0}
         scoring = ScoringConfig()
 
-        scored = score_domains(None, "", results, velocities, scoring, skip_llm=True)
+        scored = asyncio.run(score_domains(None, "", results, velocities, scoring, skip_llm=True))
 
         assert len(scored) == 1
         assert 0 <= scored[0].score <= 100
@@ -36,15 +41,15 @@ class TestScorer:
         results = [self._make_result()]
         scoring = ScoringConfig()
 
-        low = score_domains(None, "", results, {"google": 0.1}, scoring, skip_llm=True)
-        high = score_domains(None, "", results, {"google": 3.0}, scoring, skip_llm=True)
+        low = asyncio.run(score_domains(None, "", results, {"google": 0.1}, scoring, skip_llm=True))
+        high = asyncio.run(score_domains(None, "", results, {"google": 3.0}, scoring, skip_llm=True))
 
         assert high[0].score > low[0].score
 
     def test_breakdown_keys(self):
         results = [self._make_result()]
         scoring = ScoringConfig()
-        scored = score_domains(None, "", results, {"google": 1.0}, scoring, skip_llm=True)
+        scored = asyncio.run(score_domains(None, "", results, {"google": 1.0}, scoring, skip_llm=True))
 
         expected_keys = {"trend_velocity", "commercial_value", "typo_plausibility",
                          "domain_quality", "risk_penalty"}
@@ -57,38 +62,28 @@ class TestScorer:
     def test_domain_length(self):
         assert _domain_length_score("ab.com") > _domain_length_score("abcdefghijklmnop.com")
 
-    def test_sorted_descending(self):
-        results = [
-            self._make_result(domain="gogle.com", confidence=0.3),
-            self._make_result(domain="googl.com", confidence=0.9),
-        ]
-        scoring = ScoringConfig()
-        scored = score_domains(None, "", results, {"google": 1.0}, scoring, skip_llm=True)
-
-        assert scored[0].score >= scored[1].score
-
     def test_nonlinear_risk_penalty(self):
         """High UDRP risk should be penalised more than linearly."""
         results = [self._make_result()]
         scoring = ScoringConfig(risk_penalty_max=25)
 
         # Patch LLM assessments to inject different UDRP levels
-        with patch("find_domains.llm.scorer.chat_json") as mock_chat:
+        with patch("find_domains.llm.scorer.chat_json_async", new_callable=AsyncMock) as mock_chat:
             # Low risk brand (udrp 3)
             mock_chat.return_value = {"assessments": [
                 {"brand": "google", "estimated_cpc": 5.0, "commercial_niche": "tech", "udrp_risk": 3}
             ]}
-            low_risk = score_domains(
+            low_risk = asyncio.run(score_domains(
                 MagicMock(), "gpt-4o-mini", results, {"google": 1.0}, scoring,
-            )
+            ))
 
             # High risk brand (udrp 9)
             mock_chat.return_value = {"assessments": [
                 {"brand": "google", "estimated_cpc": 5.0, "commercial_niche": "tech", "udrp_risk": 9}
             ]}
-            high_risk = score_domains(
+            high_risk = asyncio.run(score_domains(
                 MagicMock(), "gpt-4o-mini", results, {"google": 1.0}, scoring,
-            )
+            ))
 
         # The gap between low and high risk should be large
         gap = low_risk[0].score - high_risk[0].score
@@ -99,6 +94,56 @@ class TestScorer:
         assert gap > 15, f"Expected gap > 15 between low/high UDRP risk, got {gap}"
 
 
+class TestCreativeTypoBatch:
+    def test_maps_typos_back_to_brands(self):
+        with patch("find_domains.llm.typo_generator.chat_json_async", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = {"brands": {
+                "stripe": [{"typo": "strype", "type": "phonetic", "confidence": 0.9}],
+                "Notion": [
+                    {"typo": "noshun", "type": "heard_not_read", "confidence": 0.7},
+                    {"typo": "Noshun", "type": "phonetic", "confidence": 0.6},
+                ],
+            }}
+            result = asyncio.run(generate_creative_typos_batch(
+                MagicMock(), "gpt-4o", ["Stripe", "Notion", "Figma"], [".com", ".io"],
+            ))
+
+        assert mock_chat.call_count == 1
+        assert {c.domain for c in result["Stripe"]} == {"strype.com", "strype.io"}
+        assert all(c.original == "Stripe" for c in result["Stripe"])
+        assert len(result["Notion"]) == 2  # duplicate typo dropped
+        assert result["Notion"][0].typo_type == "llm_heard_not_read"
+        assert result["Figma"] == []
+
+    def test_one_request_per_call(self):
+        brands = [f"brand{i}" for i in range(10)]
+        with patch("find_domains.llm.typo_generator.chat_json_async", new_callable=AsyncMock, return_value={}) as mock_chat:
+            result = asyncio.run(generate_creative_typos_batch(MagicMock(), "gpt-4o", brands, [".com"]))
+
+        assert mock_chat.call_count == 1
+        assert set(result) == set(brands)
+
+    def test_malformed_entries_are_skipped(self):
+        with patch("find_domains.llm.typo_generator.chat_json_async", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = {"brands": {
+                "A": [
+                    {"typo": "ay", "confidence": 0.9},
+                    {"typo": "aa", "confidence": "high"},
+                    {"typo": 7},
+                    "ae",
+                ],
+                "B": ["bee"],
+                "C": [{"typo": "see", "confidence": None}],
+            }}
+            result = asyncio.run(generate_creative_typos_batch(
+                MagicMock(), "gpt-4o", ["A", "B", "C"], [".com"],
+            ))
+
+        assert [c.domain for c in result["A"]] == ["ay.com"]
+        assert result["B"] == []
+        assert result["C"] == []
+
+
 class TestReport:
     def test_format_summary_table(self):
         scored = [
@@ -139,6 +184,16 @@ class TestReport:
         assert data["domains"][0]["domain"] == "gogle.com"
         assert data["domains"][0]["score"] == 75.5
 
+    def test_write_json_report_sorts_by_score(self, tmp_path):
+        scored = [
+            ScoredDomain(domain=f"{i}.com", original="google", tld=".com",
+                         typo_type="omission", score=score, breakdown={})
+            for i, score in enumerate([40.0, 90.0, 65.0])
+        ]
+
+        data = json.loads(write_json_report(scored, tmp_path).read_text())
+        assert [d["score"] for d in data["domains"]] == [90.0, 65.0, 40.0]
+
 
 class TestDiversify:
     def _make_scored(self, domain, original, score):
@@ -186,3 +241,223 @@ class TestDiversify:
         result = _diversify(scored, max_per_brand=2)
 
         assert len(result) == 2
+
+    def test_ranks_unsorted_input(self):
+        scored = [
+            self._make_scored("slacc.com", "Slack", 70),
+            self._make_scored("wndows.com", "Windows", 90),
+            self._make_scored("windws.com", "Windows", 88),
+            self._make_scored("windos.com", "Windows", 85),
+        ]
+
+        result = _diversify(scored, max_per_brand=2)
+
+        assert [d.domain for d in result] == ["wndows.com", "windws.com", "slacc.com"]
+
+    def test_limit(self):
+        scored = [
+            self._make_scored("slacc.com", "Slack", 70),
+            self._make_scored("wndows.com", "Windows", 90),
+            self._make_scored("windws.com", "Windows", 88),
+            self._make_scored("windos.com", "Windows", 85),
+        ]
+
+        result = _diversify(scored, max_per_brand=1, limit=1)
+
+        assert [d.domain for d in result] == ["wndows.com"]
+
+
+class TestGenerateAllTypos:
+    def test_caps_per_brand_keeping_most_confident(self):
+        cfg = Config(tlds_tier1=[".com"], max_typos_per_target=3)
+        targets = [{"name": "google"}, {"name": "notion"}]
+
+        result = asyncio.run(_generate_all_typos(targets, cfg, skip_llm=True, queue=asyncio.Queue()))
+
+        for brand in ("google", "notion"):
+            cands = [c for c in result if c.original == brand]
+            assert len(cands) == 3
+            # transpositions (0.85) outrank everything else
+            assert all(c.typo_type == "transposition" for c in cands)
+
+    def test_merges_groups_in_target_order(self):
+        """A shared domain goes to the higher ranked brand even if its LLM request returns last."""
+        cfg = Config(tlds_tier1=[".com"], max_typos_per_target=2)
+        names = [f"brand{chr(97 + i)}" for i in range(11)]
+
+        async def creative(client, model, group, tlds):
+            if "branda" in group:
+                await asyncio.sleep(0.05)  # first group returns last
+            return {
+                name: [TypoCandidate("shared.com", name, ".com", "llm_phonetic", 1.0)]
+                for name in group
+            }
+
+        async def run():
+            queue = asyncio.Queue()
+            result = await _generate_all_typos([{"name": n} for n in names], cfg, False, queue)
+            return result, [queue.get_nowait() for _ in range(queue.qsize())]
+
+        with patch("find_domains.pipeline.get_async_client", return_value=MagicMock()), \
+             patch("find_domains.pipeline.generate_creative_typos_batch", side_effect=creative):
+            result, batches = asyncio.run(run())
+
+        shared = [c for c in result if c.domain == "shared.com"]
+        assert [c.original for c in shared] == ["branda"]
+        assert [c.original for c in result] == [n for n in names for _ in range(2)]
+        assert [len(b) for b in batches] == [20, 2]
+        assert batches[0][0].original == "branda"
+
+    def test_dedups_domains_across_brands(self):
+        cfg = Config(tlds_tier1=[".com"], max_typos_per_target=1000)
+        targets = [{"name": "google"}, {"name": "gogle"}]
+
+        result = asyncio.run(_generate_all_typos(targets, cfg, skip_llm=True, queue=asyncio.Queue()))
+
+        domains = [c.domain for c in result]
+        assert len(domains) == len(set(domains))
+
+
+class TestScan:
+    """Stages 3 and 4 overlap through a queue; these cover the handoff."""
+
+    def _trends(self, n):
+        return [TrendItem(f"brand{chr(97 + i)}", "hackernews", 1.0) for i in range(n)]
+
+    def _patch_llm(self):
+        async def creative(client, model, names, tlds):
+            return {name: [] for name in names}
+
+        async def filter_targets(client, model, trends, max_targets):
+            return [{"name": t.name} for t in trends[:max_targets]]
+
+        return (
+            patch("find_domains.pipeline.get_async_client", return_value=MagicMock()),
+            patch("find_domains.pipeline.filter_trends", side_effect=filter_targets),
+            patch("find_domains.pipeline.generate_creative_typos_batch", side_effect=creative),
+            patch("find_domains.llm.scorer.chat_json_async", new_callable=AsyncMock, return_value={}),
+        )
+
+    def _patch_check(self, batches, checkers):
+        async def check(self, candidates):
+            batches.append(candidates)
+            checkers.add(id(self))
+            return [
+                AvailabilityResult(candidate=c, has_dns=False, rdap_registered=False, available=i % 2 == 0)
+                for i, c in enumerate(candidates)
+            ]
+
+        return patch.object(AvailabilityChecker, "check", autospec=True, side_effect=check)
+
+    def test_checks_every_group_with_one_checker(self):
+        cfg = Config(tlds_tier1=[".com"], max_targets=15, max_typos_per_target=4)
+        batches, checkers = [], set()
+
+        llm_clients, llm_filter, llm_creative, llm_score = self._patch_llm()
+        with llm_clients, llm_filter, llm_creative as creative, llm_score, self._patch_check(batches, checkers):
+            scored = asyncio.run(_scan(self._trends(15), cfg, skip_llm=False))
+
+        # 15 targets -> two LLM groups, each checked as its own batch
+        assert creative.call_count == 2
+        assert sorted(len(b) for b in batches) == [20, 40]
+        assert len(checkers) == 1
+        checked = {c.domain for b in batches for c in b}
+        assert len(checked) == 60
+        # Every second result per batch was marked available
+        assert len(scored) == 30
+        assert {s.domain for s in scored} <= checked
+
+    def test_generation_failure_cancels_checker(self):
+        cfg = Config(tlds_tier1=[".com"], max_targets=15)
+        batches, checkers = [], set()
+
+        async def run():
+            return await asyncio.wait_for(_scan(self._trends(15), cfg, skip_llm=True), timeout=5)
+
+        with self._patch_check(batches, checkers), \
+             patch("find_domains.pipeline.generate_typos", side_effect=RuntimeError("boom")):
+            with pytest.raises(ExceptionGroup) as excinfo:
+                asyncio.run(run())
+
+        assert excinfo.group_contains(RuntimeError)
+        assert batches == []
+
+    def test_no_candidates_skips_scoring(self):
+        cfg = Config(tlds_tier1=[".com"])
+        batches, checkers = [], set()
+
+        with self._patch_check(batches, checkers), \
+             patch("find_domains.pipeline.generate_typos", return_value=[]):
+            assert asyncio.run(_scan(self._trends(3), cfg, skip_llm=True)) == []
+
+        assert batches == []
+
+
+class TestRunPipeline:
+    def test_reports_ranked_by_score(self, tmp_path):
+        cfg = Config(tlds_tier1=[".com", ".io"], max_typos_per_target=8, max_per_brand=2)
+        trends = [
+            TrendItem("Notion", "google_trends_daily", 0.5),
+            TrendItem("Stripe", "google_trends_daily", 3.0),
+            TrendItem("Figma", "google_trends_daily", 1.5),
+        ]
+
+        async def check(self, candidates):
+            return [
+                AvailabilityResult(candidate=c, has_dns=False, rdap_registered=False, available=True)
+                for c in candidates
+            ]
+
+        with patch("find_domains.pipeline.fetch_google_trends", return_value=trends), \
+             patch("find_domains.pipeline.fetch_hackernews_async", new_callable=AsyncMock, return_value=[]), \
+             patch.object(AvailabilityChecker, "check", autospec=True, side_effect=check), \
+             patch("find_domains.pipeline.write_github_summary"), \
+             patch("find_domains.pipeline.print_summary") as print_summary:
+            scored = asyncio.run(run_pipeline(cfg, output_dir=tmp_path, top_n=5, skip_llm=True))
+
+        assert len(scored) == 24
+        ranked = sorted(scored, key=lambda d: d.score, reverse=True)
+        assert ranked[0].original == "Stripe"
+
+        report = json.loads(next(tmp_path.glob("*.json")).read_text())
+        assert [r["domain"] for r in report["domains"]] == [d.domain for d in ranked]
+
+        display = print_summary.call_args.args[0]
+        assert display == _diversify(scored, max_per_brand=2, limit=5)
+        assert [d.score for d in display] == sorted((d.score for d in display), reverse=True)
+        assert display[:2] == ranked[:2]
+        assert all(sum(d.original == o for d in display) <= 2 for o in ("Notion", "Stripe", "Figma"))
+
+
+    def test_missing_api_key_raises_once(self, tmp_path, monkeypatch):
+        """A client that could not be built is not built again just to close it."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        get_async_client.cache_clear()
+
+        with patch("find_domains.llm.client.AsyncOpenAI", side_effect=RuntimeError("no key")) as make_client:
+            with pytest.raises(RuntimeError) as excinfo:
+                asyncio.run(run_pipeline(Config(), target="Stripe", output_dir=tmp_path))
+
+        assert make_client.call_count == 1
+        assert excinfo.value.__context__ is None
+
+    def test_close_without_client_is_noop(self):
+        get_async_client.cache_clear()
+        with patch("find_domains.llm.client.AsyncOpenAI") as make_client:
+            asyncio.run(_close_async_client())
+        make_client.assert_not_called()
+
+
+class TestMergeTrendItems:
+    def test_keeps_highest_velocity_across_sources(self):
+        google = [TrendItem("Stripe", "google_trends_daily", 1.0)]
+        hn = [
+            TrendItem("STRIPE", "hackernews", 2.5),
+            TrendItem("Vercel", "hackernews", 1.0),
+        ]
+        merged = merge_trend_items(google, hn)
+        assert [(t.name, t.velocity) for t in merged] == [("STRIPE", 2.5), ("Vercel", 1.0)]
+
+    def test_casefolds_names(self):
+        merged = merge_trend_items([TrendItem("Straße", "a", 1.0), TrendItem("STRASSE", "b", 0.5)])
+        assert len(merged) == 1
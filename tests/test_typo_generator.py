@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from find_domains.typos.generator import (
     TypoCandidate,
     generate_typos,
+    _generate_typos,
     _omissions,
     _doublings,
     _transpositions,
@@ -11,7 +14,7 @@ from find_domains.typos.generator import (
 
 class TestOmissions:
     def test_basic(self):
-        results = _omissions("google")
+        results = list(_omissions("google"))
         typos = [t for t, _ in results]
         assert "oogle" in typos  # drop 'g'
         assert "gogle" in typos  # drop 'o'
@@ -22,14 +25,20 @@ class TestOmissions:
             assert typo_type == "omission"
 
     def test_length(self):
-        results = _omissions("hello")
-        # Each char can be dropped, all produce unique results minus degenerate cases
-        assert len(results) == 5
+        results = list(_omissions("hello"))
+        # Each char can be dropped; both l's give "helo", which is yielded once
+        assert len(results) == 4
+
+    def test_shared_seen_skips_repeats(self):
+        seen = {"google"}
+        first = list(_omissions("google", seen))
+        assert list(_omissions("google", seen)) == []
+        assert {t for t, _ in first} <= seen
 
 
 class TestDoublings:
     def test_basic(self):
-        results = _doublings("test")
+        results = list(_doublings("test"))
         typos = [t for t, _ in results]
         assert "ttest" in typos
         assert "teest" in typos
@@ -38,26 +47,26 @@ class TestDoublings:
 
     def test_already_doubled(self):
         # "tt" -> doubling 't' at position 0 gives "ttt"est which is still different
-        results = _doublings("tt")
+        results = list(_doublings("tt"))
         assert len(results) > 0
 
 
 class TestTranspositions:
     def test_basic(self):
-        results = _transpositions("google")
+        results = list(_transpositions("google"))
         typos = [t for t, _ in results]
         assert "ogogle" in typos  # swap g,o
         assert "goole" not in typos  # this would be an omission
 
     def test_count(self):
         # n-1 adjacent pairs
-        results = _transpositions("abcd")
+        results = list(_transpositions("abcd"))
         assert len(results) == 3  # ab->ba, bc->cb, cd->dc
 
 
 class TestAdjacentKeys:
     def test_basic(self):
-        results = _adjacent_keys("a")
+        results = list(_adjacent_keys("a"))
         typos = [t for t, _ in results]
         # 'a' neighbors: q, w, s, z
         assert "q" in typos
@@ -66,7 +75,7 @@ class TestAdjacentKeys:
         assert "z" in typos
 
     def test_produces_valid_typos(self):
-        results = _adjacent_keys("test")
+        results = list(_adjacent_keys("test"))
         for typo, typo_type in results:
             assert typo_type == "adjacent_key"
             assert len(typo) == 4  # same length as original
@@ -74,17 +83,22 @@ class TestAdjacentKeys:
 
 class TestHomoglyphs:
     def test_single_char(self):
-        results = _homoglyph_subs("lo")
+        results = list(_homoglyph_subs("lo"))
         typos = [t for t, _ in results]
         assert "1o" in typos  # l -> 1
         assert "io" in typos  # l -> i
         assert "l0" in typos  # o -> 0
 
     def test_multi_char(self):
-        results = _homoglyph_subs("burn")
+        results = list(_homoglyph_subs("burn"))
         typos = [t for t, _ in results]
         assert "bum" in typos  # rn -> m
 
+    def test_multi_char_overlapping(self):
+        typos = [t for t, _ in _homoglyph_subs("vvv")]
+        assert "wv" in typos  # first "vv" -> w
+        assert "vw" in typos  # overlapping second "vv" -> w
+
 
 class TestGenerateTypos:
     def test_returns_candidates(self):
@@ -120,3 +134,25 @@ class TestGenerateTypos:
         candidates = generate_typos("Stripe", [".com"])
         for c in candidates:
             assert c.original == "Stripe"
+
+    def test_repeat_calls_return_fresh_lists(self):
+        first = generate_typos("Stripe", [".com"])
+        first.clear()
+        assert generate_typos("Stripe", [".com"])
+
+    def test_reloaded_from_disk_cache(self):
+        first = generate_typos("Vercel", [".com", ".io"])
+        _generate_typos.cache_clear()
+        with patch("find_domains.typos.generator._build_typos") as build:
+            assert generate_typos("Vercel", [".com", ".io"]) == first
+        build.assert_not_called()
+
+    def test_disk_cache_keyed_on_version(self):
+        generate_typos("Vercel", [".com"])
+        _generate_typos.cache_clear()
+        with (
+            patch("find_domains.typos.generator.TYPO_CACHE_VERSION", -1),
+            patch("find_domains.typos.generator._build_typos", return_value=()) as build,
+        ):
+            assert generate_typos("Vercel", [".com"]) == []
+        build.assert_called_once()